@@ -0,0 +1,100 @@
+"""Interactive sales dashboard: ``streamlit run dashboard.py``.
+
+The cube is built once per input file and shared by every session
+(``st.cache_resource``); each finished table is memoized per filter
+combination (``st.cache_data``), so moving a slider re-serves a cached
+table or rolls up the cube instead of re-running the notebook's filters.
+"""
+
+import plotly.express as px
+import streamlit as st
+
+from video_games.aggregates import REGIONS
+from video_games.dashboard import VIEW_DIMENSIONS, DashboardData
+from video_games.loader import DATA_PATH, file_digest
+from video_games.rendering import REGION_TITLES
+
+
+@st.cache_resource(show_spinner='Building the sales cube...')
+def load_data(digest):
+    # ``digest`` only keys the cache, so a changed CSV builds a new cube.
+    return DashboardData.from_path(DATA_PATH)
+
+
+@st.cache_data(max_entries=1024)
+def leaders(digest, dimension, region, first, last, top):
+    return load_data(digest).leaders(dimension, region, first, last, top)
+
+
+@st.cache_data(max_entries=1024)
+def yearly(digest, dimension, region, first, last, top):
+    return load_data(digest).yearly(dimension, region, first, last, top)
+
+
+@st.cache_data(max_entries=1024)
+def region_shares(digest, dimension, first, last, top):
+    return load_data(digest).region_shares(dimension, first, last, top)
+
+
+@st.cache_data(max_entries=1024)
+def trends(digest, dimension, region, last, window):
+    return load_data(digest).trends(dimension, region, last, window)
+
+
+@st.cache_data(ttl=60)
+def input_digest():
+    return file_digest(DATA_PATH)
+
+
+def main():
+    st.set_page_config(page_title='Video Game Sales', layout='wide')
+    digest = input_digest()
+    data = load_data(digest)
+    first_year, last_year = data.years
+
+    with st.sidebar:
+        st.header('Filters')
+        first, last = st.slider('Release years', first_year, last_year, (1996, last_year))
+        region = st.selectbox('Region', REGIONS, index=REGIONS.index('total_sales'),
+                              format_func=lambda name: REGION_TITLES.get(name, name))
+        dimension = st.radio('Break down by', VIEW_DIMENSIONS,
+                             format_func=lambda name: name.title())
+        top = st.slider('Top N', 3, 15, 5)
+
+    region_title = REGION_TITLES.get(region, region)
+    st.title(f'{region_title} sales by {dimension}, {first}-{last}')
+    leaders_tab, yearly_tab, regions_tab, trends_tab = st.tabs(
+        ['Leaders', 'Yearly', 'Regions', 'Trends'])
+
+    table = leaders(digest, dimension, region, first, last, top)
+    with leaders_tab:
+        left, right = st.columns(2)
+        left.plotly_chart(px.bar(table.reset_index(), x=dimension, y='sales',
+                                 labels={'sales': 'Sales (USD million)'}),
+                          use_container_width=True)
+        right.plotly_chart(px.pie(table.reset_index(), names=dimension, values='sales'),
+                           use_container_width=True)
+        st.dataframe(table.style.format({'sales': '{:.2f}', 'share': '{:.1%}'}))
+
+    with yearly_tab:
+        series = yearly(digest, dimension, region, first, last, top)
+        st.plotly_chart(px.line(series, labels={'value': 'Sales (USD million)',
+                                                'year_of_release': 'Year'}),
+                        use_container_width=True)
+
+    with regions_tab:
+        shares = region_shares(digest, dimension, first, last, top)
+        shares = shares.rename(columns=REGION_TITLES)
+        st.plotly_chart(px.imshow(shares, text_auto='.1%', aspect='auto',
+                                  color_continuous_scale='Blues'),
+                        use_container_width=True)
+
+    with trends_tab:
+        window = st.slider('Trend window (years)', 3, 10, 5)
+        result = trends(digest, dimension, region, last, window)
+        st.dataframe(result.style.format({'last_sales': '{:.2f}', 'yoy': '{:.1%}',
+                                          'cagr': '{:.1%}', 'slope': '{:.2f}',
+                                          'pvalue': '{:.3f}'}, na_rep='-'))
+
+
+main()
@@ -0,0 +1,97 @@
+"""Reusable building blocks for the video game sales analysis.
+
+The notebook export (Video_Game_Data_2016.py) walks through the analysis step
+by step; the modules in this package implement the same steps so they can be
+run repeatedly and on larger data without re-running the notebook.
+"""
+
+from video_games.aggregates import AggregateCube, aggregate
+from video_games.binning import histogram, scatter_view
+from video_games.cache import ResultCache
+from video_games.correlation import correlation_matrix, grouped_correlations
+from video_games.cube import SalesCube
+from video_games.dedup import find_duplicates, merge_duplicates
+from video_games.distributions import box_stats, box_table
+from video_games.encoding import CategoryDictionaries, load_dictionaries
+from video_games.filters import Bitmap, FilterIndex
+from video_games.forecasting import forecast_sales, forecast_series
+from video_games.hypothesis import pairwise_tests, pvalue_matrix
+from video_games.incremental import GameStore
+from video_games.lifecycle import fit_lifecycles, platform_lifecycles
+from video_games.loader import (
+    DATA_PATH,
+    SALES_COLUMNS,
+    clean_games,
+    dictionary_path,
+    file_digest,
+    load_games,
+    read_games_csv,
+    read_snapshot,
+    write_snapshot,
+)
+from video_games.missing import MaskedColumn, from_sentinels, score_summary
+from video_games.regions import RegionReport, region_report
+from video_games.rendering import FigureSpec, render_report, report_specs
+from video_games.resampling import bootstrap_groups, bootstrap_shares, permutation_test
+from video_games.runner import Section, run_report
+from video_games.shared import SharedGames, attach
+from video_games.streaming import stream_cube
+from video_games.titles import multiplatform_games, resolve_titles
+from video_games.trends import category_trends, yoy_growth
+from video_games.windows import WindowIndex
+
+__all__ = [
+    'AggregateCube',
+    'Bitmap',
+    'CategoryDictionaries',
+    'DATA_PATH',
+    'FigureSpec',
+    'FilterIndex',
+    'GameStore',
+    'MaskedColumn',
+    'RegionReport',
+    'ResultCache',
+    'SALES_COLUMNS',
+    'SalesCube',
+    'Section',
+    'SharedGames',
+    'WindowIndex',
+    'aggregate',
+    'attach',
+    'bootstrap_groups',
+    'bootstrap_shares',
+    'box_stats',
+    'box_table',
+    'category_trends',
+    'clean_games',
+    'correlation_matrix',
+    'dictionary_path',
+    'file_digest',
+    'find_duplicates',
+    'fit_lifecycles',
+    'forecast_sales',
+    'forecast_series',
+    'from_sentinels',
+    'grouped_correlations',
+    'histogram',
+    'load_dictionaries',
+    'load_games',
+    'merge_duplicates',
+    'multiplatform_games',
+    'pairwise_tests',
+    'permutation_test',
+    'platform_lifecycles',
+    'pvalue_matrix',
+    'read_games_csv',
+    'read_snapshot',
+    'region_report',
+    'render_report',
+    'report_specs',
+    'resolve_titles',
+    'run_report',
+    'scatter_view',
+    'score_summary',
+    'stream_cube',
+    'write_snapshot',
+    'yoy_growth',
+]
@@ -0,0 +1,144 @@
+"""Single-pass grouped aggregation over platform, genre, rating and year.
+
+The notebook builds every per-category total with a Python loop such as
+``for platform in platform_choice: df[df['platform'] == platform]['na_sales'].sum()``,
+which scans the whole frame once per category and region. Here each dimension
+is reduced to integer category codes and every region is summarised for all
+categories at once with ``np.bincount`` and one sort per region.
+"""
+
+import numpy as np
+import pandas as pd
+
+from video_games.loader import SALES_COLUMNS
+
+DIMENSIONS = ['platform', 'genre', 'rating', 'year_of_release']
+REGIONS = SALES_COLUMNS + ['total_sales']
+STATISTICS = ['sum', 'count', 'mean', 'q1', 'median', 'q3']
+
+
+def category_codes(column):
+    """Return ``(codes, labels)`` for a column, with -1 marking missing values."""
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        return column.cat.codes.to_numpy(), column.cat.categories
+    codes, labels = pd.factorize(column, sort=True)
+    return codes, pd.Index(labels)
+
+
+def sorted_quantile(sorted_values, starts, counts, q):
+    """Return the ``q`` quantile of every group of an already sorted array.
+
+    Group ``i`` occupies ``sorted_values[starts[i]:starts[i] + counts[i]]``;
+    quantiles interpolate linearly between order statistics, as pandas does
+    by default, and are NaN for empty groups.
+    """
+    result = np.full(len(counts), np.nan)
+    present = counts > 0
+    position = starts[present] + q * (counts[present] - 1)
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    weight = position - lower
+    result[present] = sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+    return result
+
+
+def grouped_stats(codes, n_groups, values, keep=None):
+    """Summarise ``values`` for every group code in one sorted pass.
+
+    Only rows with a valid code and a true ``keep`` flag take part. By default
+    ``keep`` selects positive sales, matching the notebook's regional frames
+    (``relevant_games[relevant_games['na_sales'] > 0]``).
+    Returns a DataFrame with one row per code and the ``STATISTICS`` columns.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if keep is None:
+        keep = values > 0
+    keep = (codes >= 0) & keep
+    kept_codes = codes[keep]
+    kept_values = values[keep]
+
+    order = np.lexsort((kept_values, kept_codes))
+    sorted_values = kept_values[order]
+    counts = np.bincount(kept_codes, minlength=n_groups)
+    sums = np.bincount(kept_codes, weights=kept_values, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.where(counts > 0, sums / counts, np.nan)
+    return pd.DataFrame({
+        'sum': sums,
+        'count': counts,
+        'mean': means,
+        'q1': sorted_quantile(sorted_values, starts, counts, 0.25),
+        'median': sorted_quantile(sorted_values, starts, counts, 0.5),
+        'q3': sorted_quantile(sorted_values, starts, counts, 0.75),
+    })
+
+
+class AggregateCube:
+    """Per-dimension, per-region summary tables computed by ``aggregate``.
+
+    ``tables[dimension]`` holds one row per category and a two-level column
+    index of ``(region, statistic)``.
+    """
+
+    def __init__(self, tables):
+        self.tables = tables
+
+    @property
+    def dimensions(self):
+        return list(self.tables)
+
+    def table(self, dimension, region):
+        """Return the statistics of one region for every category of a dimension."""
+        return self.tables[dimension][region]
+
+    def stat(self, dimension, statistic):
+        """Return one statistic as a categories x regions frame."""
+        return self.tables[dimension].xs(statistic, axis=1, level=1)
+
+    def top(self, dimension, region, n=5, by='sum'):
+        """Return the ``n`` leading categories of a region, e.g. the top five platforms."""
+        return self.table(dimension, region).sort_values(by, ascending=False).head(n)
+
+    def shares(self, dimension, region):
+        """Return each category's share of the region's total sales."""
+        sums = self.table(dimension, region)['sum']
+        return sums / sums.sum()
+
+
+def region_values(games, regions=REGIONS, custom_regions=None):
+    """Return ``{region: float64 array}`` for sales columns and custom regions.
+
+    ``custom_regions`` maps a new region name to the columns it adds up,
+    e.g. ``{'western': ['na_sales', 'eu_sales']}``; the sums reuse the
+    arrays already extracted, so a custom region costs no extra scan of the
+    frame. Missing sales count as zero.
+    """
+    values = {}
+    needed = list(regions) + [column for columns in (custom_regions or {}).values()
+                              for column in columns]
+    for column in dict.fromkeys(needed):
+        values[column] = games[column].to_numpy(dtype=np.float64, na_value=0.0)
+    for name, columns in (custom_regions or {}).items():
+        values[name] = np.sum([values[column] for column in columns], axis=0)
+    return {region: values[region] for region in list(regions) + list(custom_regions or {})}
+
+
+def aggregate(games, dimensions=DIMENSIONS, regions=REGIONS, custom_regions=None):
+    """Build an ``AggregateCube`` for every dimension x region combination.
+
+    ``custom_regions`` adds derived regions, see ``region_values``.
+    """
+    values_by_region = region_values(games, regions, custom_regions)
+    tables = {}
+    for dimension in dimensions:
+        codes, labels = category_codes(games[dimension])
+        per_region = {
+            region: grouped_stats(codes, len(labels), values)
+            for region, values in values_by_region.items()
+        }
+        table = pd.concat(per_region, axis=1)
+        table.index = pd.Index(labels, name=dimension)
+        tables[dimension] = table
+    return AggregateCube(tables)
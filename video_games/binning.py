@@ -0,0 +1,195 @@
+"""Pre-binned histograms and point-budget downsampling for large views.
+
+Cell 20 of the notebook sizes the release-year histogram with
+``len(df['year_of_release'].unique())`` and hands every row to
+``plot(kind='hist')``; cell 37 scatters every X360 row of user and critic
+score against total sales. Both ship raw rows to the plotting layer. Here
+1-D and 2-D histograms are computed for every category at once: each row's
+bin index is found with ``np.searchsorted`` on fixed edges, combined with
+its category code into one flat index, and counted (or weighted by a sales
+column) with a single ``np.bincount``. Only the bin arrays reach the plot.
+Sales are heavily skewed (a linear axis puts almost every game in the first
+bin), so sales columns get log-spaced edges unless told otherwise;
+quantile edges are also available.
+Scatter views under a point budget keep their rows, larger ones are either
+binned or downsampled with the largest values always kept.
+"""
+
+import numpy as np
+import pandas as pd
+
+from video_games.aggregates import category_codes
+from video_games.loader import SALES_COLUMNS
+from video_games.missing import MaskedColumn
+
+POINT_BUDGET = 20_000
+DEFAULT_BINS = 50
+SCALES = ('linear', 'log', 'quantile')
+
+# Columns binned on a log scale by default.
+LOG_COLUMNS = (*SALES_COLUMNS, 'total_sales')
+
+
+def bin_edges(values, bins=DEFAULT_BINS, integer=False, scale='linear'):
+    """Return fixed bin edges for ``values`` (a ``MaskedColumn``).
+
+    With ``integer`` every whole number gets its own bin, e.g. one bin per
+    release year without counting unique values. Otherwise ``scale`` is
+    'linear', 'log' (geometric from the smallest positive value, with zeros
+    in a bin of their own; negative data falls back to linear) or
+    'quantile' (about the same number of values per bin; tied quantiles
+    merge, so fewer bins may come back).
+    """
+    if scale not in SCALES:
+        raise ValueError(f'unknown scale {scale!r}, expected one of {SCALES}')
+    present = values.values[values.valid]
+    if len(present) == 0:
+        return np.array([0.0, 1.0])
+    low, high = present.min(), present.max()
+    if integer:
+        return np.arange(np.floor(low), np.floor(high) + 2) - 0.5
+    if low == high:
+        return np.array([low - 0.5, high + 0.5])
+    if scale == 'log' and low > 0:
+        return np.geomspace(low, high, bins + 1)
+    if scale == 'log' and low == 0:
+        smallest = present[present > 0].min()
+        if smallest < high:
+            return np.r_[0.0, np.geomspace(smallest, high, bins)]
+    if scale == 'quantile':
+        return np.unique(np.quantile(present, np.linspace(0, 1, bins + 1)))
+    return np.linspace(low, high, bins + 1)
+
+
+def _bin_index(values, edges):
+    # Bin of every value, -1 outside the edges; the last edge is inclusive.
+    index = np.searchsorted(edges, values, side='right') - 1
+    index[values == edges[-1]] = len(edges) - 2
+    index[(values < edges[0]) | (values > edges[-1]) | np.isnan(values)] = -1
+    return index
+
+
+class BinnedHistogram:
+    """Per-category bin totals over shared edges.
+
+    ``counts`` has shape ``(categories, *bins)``; ``sums`` maps each weight
+    column to an array of the same shape. ``edges`` holds one edge array
+    per binned column.
+    """
+
+    def __init__(self, columns, edges, labels, counts, sums):
+        self.columns = list(columns)
+        self.edges = edges
+        self.labels = labels
+        self.counts = counts
+        self.sums = sums
+
+    def _position(self, category):
+        return 0 if category is None else self.labels.get_loc(category)
+
+    def table(self, category=None, measure='count'):
+        """Return one category's bins as a Series (1-D) or a y x x frame (2-D)."""
+        values = self.counts if measure == 'count' else self.sums[measure]
+        values = values[self._position(category)]
+        centres = [(edges[:-1] + edges[1:]) / 2 for edges in self.edges]
+        if len(self.columns) == 1:
+            return pd.Series(values, index=pd.Index(centres[0], name=self.columns[0]), name=measure)
+        return pd.DataFrame(values.T, index=pd.Index(centres[1], name=self.columns[1]),
+                            columns=pd.Index(centres[0], name=self.columns[0]))
+
+    def points(self, category=None, measure='count'):
+        """Return the centres of the non-empty 2-D bins with their totals, for a sized scatter."""
+        if len(self.columns) != 2:
+            raise ValueError('points needs a 2-D histogram')
+        grid = self.table(category, measure)
+        grid = grid.stack()
+        grid = grid[grid > 0]
+        return grid.rename(measure).reset_index()[[self.columns[0], self.columns[1], measure]]
+
+
+def histogram(games, columns, by=None, bins=DEFAULT_BINS, weights=(), integer=None,
+              scale=None):
+    """Bin ``columns`` (one or two names) for every ``by`` category in one pass.
+
+    Rows with a missing value in any binned column are skipped. ``weights``
+    names sales columns to total per bin alongside the counts; ``integer``
+    lists columns binned one bin per whole number (release years by
+    default). ``scale`` is one of ``SCALES`` for every column or a
+    ``{column: scale}`` dict; by default ``LOG_COLUMNS`` are log-scaled and
+    the rest linear. Returns a ``BinnedHistogram``; without ``by`` it has a
+    single category.
+    """
+    if isinstance(columns, str):
+        columns = [columns]
+    if isinstance(bins, int):
+        bins = [bins] * len(columns)
+    integer = {'year_of_release'} if integer is None else set(integer)
+    if scale is None:
+        scale = {column: 'log' for column in columns if column in LOG_COLUMNS}
+    if isinstance(scale, str):
+        scale = dict.fromkeys(columns, scale)
+    if by is None:
+        codes, labels = np.zeros(len(games), dtype=np.int64), pd.Index([None])
+    else:
+        codes, labels = category_codes(games[by])
+        labels = pd.Index(labels, name=by)
+
+    flat = codes.astype(np.int64)
+    keep = codes >= 0
+    edges = []
+    for column, column_bins in zip(columns, bins):
+        values = MaskedColumn.from_series(games[column])
+        column_edges = bin_edges(values, column_bins, integer=column in integer,
+                                 scale=scale.get(column, 'linear'))
+        index = _bin_index(values.values, column_edges)
+        keep &= index >= 0
+        flat = flat * (len(column_edges) - 1) + index
+        edges.append(column_edges)
+
+    shape = (len(labels),) + tuple(len(column_edges) - 1 for column_edges in edges)
+    size = int(np.prod(shape))
+    counts = np.bincount(flat[keep], minlength=size).reshape(shape)
+    sums = {}
+    for weight in weights:
+        values = games[weight].to_numpy(dtype=np.float64, na_value=0.0)[keep]
+        sums[weight] = np.bincount(flat[keep], weights=values, minlength=size).reshape(shape)
+    return BinnedHistogram(columns, edges, labels, counts, sums)
+
+
+def downsample(frame, budget=POINT_BUDGET, keep_largest=None, largest_share=0.05, seed=0):
+    """Return at most ``budget`` rows of ``frame``, unchanged when it already fits.
+
+    The top ``largest_share`` of the budget goes to the rows with the largest
+    ``keep_largest`` values (the outliers a scatter is usually read for, such
+    as Wii Sports); the rest is a uniform sample of the remaining rows.
+    """
+    if len(frame) <= budget:
+        return frame
+    chosen = np.zeros(len(frame), dtype=bool)
+    if keep_largest is not None:
+        n_largest = int(budget * largest_share)
+        values = frame[keep_largest].to_numpy(dtype=np.float64, na_value=-np.inf)
+        chosen[np.argpartition(-values, n_largest)[:n_largest]] = True
+    rest = np.flatnonzero(~chosen)
+    rng = np.random.default_rng(seed)
+    chosen[rng.choice(rest, budget - chosen.sum(), replace=False)] = True
+    return frame[chosen]
+
+
+def scatter_view(games, x, y, budget=POINT_BUDGET, bins=DEFAULT_BINS, mode='bin', scale=None):
+    """Return what a scatter of ``x`` against ``y`` should draw within ``budget``.
+
+    Rows with a missing ``x`` or ``y`` are dropped. Under the budget the
+    result is ``('points', rows)``; above it ``mode='bin'`` gives
+    ``('bins', points)`` with the non-empty 2-D bins and their counts, and
+    ``mode='sample'`` gives ``('points', downsampled rows)``. ``scale`` sets
+    the bin edges as in ``histogram``, so sales axes are log-spaced by default.
+    """
+    present = games[[x, y]].notna().all(axis=1).to_numpy()
+    if present.sum() <= budget:
+        return 'points', games.loc[present, [x, y]]
+    if mode == 'bin':
+        return 'bins', histogram(games, [x, y], bins=bins, scale=scale).points()
+    if mode == 'sample':
+        return 'points', downsample(games.loc[present, [x, y]], budget, keep_largest=y)
+    raise ValueError(f"unknown mode {mode!r}, expected 'bin' or 'sample'")
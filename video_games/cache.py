@@ -0,0 +1,166 @@
+"""Content-addressed cache of intermediate results across runs.
+
+Every run of the notebook re-cleans ``df_games``, re-filters
+``relevant_games`` and redoes each regional groupby even when
+moved_games.csv has not changed. ``ResultCache`` stores the output of a
+step under a key derived from the input file's SHA-256, the step name and
+its parameters (year window, region, top-N, ...). Frames that survive an
+Arrow round trip unchanged are written as Feather files, everything else
+(including frames with nullable integer axes or tuple labels) is pickled,
+and an entry that cannot be read back counts as a miss. Hits refresh the entry's
+modification time and the oldest entries are evicted once the cache grows
+past its size limit, so the directory behaves as an on-disk LRU.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from video_games.loader import CACHE_DIR, DATA_PATH, file_digest
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # frames fall back to pickles
+    pa = None
+    feather = None
+
+# Errors that mark an entry as unreadable, e.g. truncated or from another version.
+_READ_ERRORS = (OSError, EOFError, ValueError, TypeError, AttributeError, ImportError,
+                pickle.UnpicklingError) + ((pa.ArrowException,) if pa is not None else ())
+
+RESULTS_DIR = CACHE_DIR / 'results'
+MAX_BYTES = 512 * 1024 * 1024
+
+# Bump whenever a cached step changes its output so old entries are not served.
+CACHE_VERSION = 1
+
+
+class ResultCache:
+    """On-disk step results keyed by input digest, step name and parameters."""
+
+    def __init__(self, directory=RESULTS_DIR, max_bytes=MAX_BYTES):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self._digests = {}
+
+    def input_digest(self, path=DATA_PATH):
+        """Return the SHA-256 of ``path``, rehashing only when size or mtime change."""
+        path = Path(path)
+        status = path.stat()
+        stamp = (status.st_size, status.st_mtime_ns)
+        cached = self._digests.get(path)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, file_digest(path))
+            self._digests[path] = cached
+        return cached[1]
+
+    def key(self, step, digest, params=None):
+        """Return the cache key of ``step`` run on input ``digest`` with ``params``."""
+        payload = json.dumps({'step': step, 'input': digest, 'params': params or {},
+                              'version': CACHE_VERSION}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def _entries(self, key):
+        return [self.directory / f'{key}.feather', self.directory / f'{key}.pkl']
+
+    def get(self, key):
+        """Return the stored value, or ``None`` on a miss.
+
+        An entry that fails to load is deleted and reported as a miss.
+        """
+        for path in self._entries(key):
+            if path.exists():
+                try:
+                    value = self._read(path)
+                except _READ_ERRORS:
+                    path.unlink(missing_ok=True)
+                    return None
+                os.utime(path)
+                return value
+        return None
+
+    def _read(self, path):
+        if path.suffix == '.feather':
+            return feather.read_table(path, memory_map=True).to_pandas()
+        with open(path, 'rb') as handle:
+            return pickle.load(handle)
+
+    def put(self, key, value):
+        """Store ``value`` under ``key`` and evict old entries past the size limit."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        table = None
+        if feather is not None and isinstance(value, pd.DataFrame):
+            table = _arrow_table(value)
+        suffix = '.pkl' if table is None else '.feather'
+        # Each writer gets its own temporary file, so concurrent puts of the
+        # same key never rename a half-written file into place.
+        with tempfile.NamedTemporaryFile(dir=self.directory, prefix=key, suffix='.tmp',
+                                         delete=False) as handle:
+            tmp_path = Path(handle.name)
+        try:
+            if table is None:
+                with open(tmp_path, 'wb') as handle:
+                    pickle.dump(value, handle, protocol=pickle.HIGHEST_PROTOCOL)
+            else:
+                feather.write_feather(table, tmp_path, compression='uncompressed')
+            tmp_path.replace(self.directory / f'{key}{suffix}')
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+        self.evict()
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits ``max_bytes``."""
+        if not self.directory.exists():
+            return
+        entries = [(path.stat(), path) for path in self.directory.iterdir()
+                   if path.suffix in ('.feather', '.pkl')]
+        total = sum(status.st_size for status, _ in entries)
+        for status, path in sorted(entries, key=lambda entry: entry[0].st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= status.st_size
+
+    def clear(self):
+        """Delete every stored entry."""
+        for path in self.directory.glob('*'):
+            if path.suffix in ('.feather', '.pkl'):
+                path.unlink(missing_ok=True)
+
+    def memoize(self, step, compute, path=DATA_PATH, **params):
+        """Return ``compute()`` for ``step``, served from the cache when possible.
+
+        The key combines the digest of the input file at ``path`` with
+        ``params``, so a changed CSV or different parameters recompute.
+        ``compute`` is called without arguments on a miss.
+        """
+        key = self.key(step, self.input_digest(path), params)
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            self.put(key, value)
+        return value
+
+
+def _arrow_table(frame):
+    # The frame as an Arrow table, or None when it would not read back as the
+    # same frame (tuple labels, an Int16 axis with <NA>, ...).
+    try:
+        table = pa.Table.from_pandas(frame)
+        restored = table.to_pandas()
+    except (pa.ArrowException, TypeError, ValueError):
+        return None
+    same = (restored.equals(frame)
+            and restored.index.dtype == frame.index.dtype
+            and restored.columns.dtype == frame.columns.dtype
+            and restored.index.names == frame.index.names
+            and restored.columns.names == frame.columns.names
+            and restored.dtypes.equals(frame.dtypes))
+    return table if same else None
@@ -0,0 +1,116 @@
+"""Correlation between review scores and sales for every platform at once.
+
+Cells 38-39 of the notebook compare yearly mean X360 sales with yearly mean
+scores using ``ttest_ind``, which tests a difference in means rather than a
+relationship, and average in the -1 score sentinels. Here Pearson, Spearman
+and Kendall correlations of each score with each sales column are computed
+for every platform (or any other category) together. Pearson comes from
+grouped sums of the pairwise-complete values; Spearman is Pearson on
+within-group ranks, ranked once per score column and shared by every sales
+column; Kendall's tau-b uses scipy per group on the same filtered arrays.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from video_games.aggregates import REGIONS, category_codes
+from video_games.missing import SCORE_COLUMNS, MaskedColumn
+
+METHODS = ('pearson', 'spearman', 'kendall')
+
+
+def _grouped_pearson(codes, n_groups, x, y):
+    counts = np.bincount(codes, minlength=n_groups).astype(float)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_x = np.bincount(codes, weights=x, minlength=n_groups) / counts
+        mean_y = np.bincount(codes, weights=y, minlength=n_groups) / counts
+        dx = x - mean_x[codes]
+        dy = y - mean_y[codes]
+        covariance = np.bincount(codes, weights=dx * dy, minlength=n_groups)
+        spread_x = np.bincount(codes, weights=dx * dx, minlength=n_groups)
+        spread_y = np.bincount(codes, weights=dy * dy, minlength=n_groups)
+        r = covariance / np.sqrt(spread_x * spread_y)
+    return counts.astype(np.int64), np.clip(r, -1, 1)
+
+
+def _pearson_pvalues(r, n):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = r * np.sqrt((n - 2) / (1 - r ** 2))
+        p = 2 * stats.t.sf(np.abs(t), n - 2)
+    p[np.abs(r) == 1] = 0.0
+    p[n < 3] = np.nan
+    return p
+
+
+def _grouped_ranks(codes, values):
+    return pd.Series(values).groupby(codes).rank(method='average').to_numpy()
+
+
+def _grouped_kendall(codes, n_groups, x, y):
+    order = np.argsort(codes, kind='stable')
+    bounds = np.cumsum(np.bincount(codes, minlength=n_groups))[:-1]
+    taus = np.full(n_groups, np.nan)
+    p_values = np.full(n_groups, np.nan)
+    for group, (group_x, group_y) in enumerate(zip(np.split(x[order], bounds),
+                                                   np.split(y[order], bounds))):
+        if len(group_x) > 2:
+            result = stats.kendalltau(group_x, group_y)
+            taus[group], p_values[group] = result[0], result[1]
+    return taus, p_values
+
+
+def grouped_correlations(games, by='platform', scores=SCORE_COLUMNS, sales=REGIONS,
+                         methods=METHODS):
+    """Correlate every score with every sales column within each ``by`` category.
+
+    Rows with a missing score are skipped for that score. Returns one row per
+    (category, score, sales column, method) with the number of games, the
+    coefficient and its two-sided p-value.
+    """
+    codes, labels = category_codes(games[by])
+    labels = np.asarray(labels, dtype=object)
+    n_groups = len(labels)
+    sales_values = {column: games[column].to_numpy(dtype=np.float64, na_value=np.nan)
+                    for column in sales}
+
+    frames = []
+    for score in scores:
+        score_column = MaskedColumn.from_series(games[score])
+        base_keep = score_column.valid & (codes >= 0)
+        score_ranks, ranked_rows = None, None
+        for column, values in sales_values.items():
+            keep = base_keep & ~np.isnan(values)
+            group_codes = codes[keep]
+            x = score_column.values[keep]
+            y = values[keep]
+            for method in methods:
+                if method == 'pearson':
+                    n, r = _grouped_pearson(group_codes, n_groups, x, y)
+                    p = _pearson_pvalues(r, n)
+                elif method == 'spearman':
+                    # Sales are rarely missing, so the score ranks of one
+                    # score column usually serve every sales column.
+                    if ranked_rows is None or not np.array_equal(ranked_rows, keep):
+                        score_ranks, ranked_rows = _grouped_ranks(group_codes, x), keep
+                    n, r = _grouped_pearson(group_codes, n_groups, score_ranks,
+                                            _grouped_ranks(group_codes, y))
+                    p = _pearson_pvalues(r, n)
+                elif method == 'kendall':
+                    n = np.bincount(group_codes, minlength=n_groups)
+                    r, p = _grouped_kendall(group_codes, n_groups, x, y)
+                else:
+                    raise ValueError(f'unknown method {method!r}, expected one of {METHODS}')
+                frames.append(pd.DataFrame({
+                    by: labels, 'score': score, 'sales': column, 'method': method,
+                    'n': n, 'r': r, 'pvalue': p,
+                }))
+    result = pd.concat(frames, ignore_index=True)
+    return result[result['n'] > 0].reset_index(drop=True)
+
+
+def correlation_matrix(correlations, method='pearson', value='r'):
+    """Pivot ``grouped_correlations`` output into categories x (score, sales)."""
+    by = correlations.columns[0]
+    rows = correlations[correlations['method'] == method]
+    return rows.pivot_table(index=by, columns=['score', 'sales'], values=value)
@@ -0,0 +1,218 @@
+"""Materialised sales cube over platform, genre, rating, year and region.
+
+The notebook recomputes the same aggregates many times, for example
+``groupby('platform')['total_sales'].sum()`` in three cells and the yearly
+sales series of each platform in five. ``SalesCube`` scans the rows once and
+keeps dense NumPy arrays indexed by category codes, so every later table is a
+slice and a sum over the array rather than a scan of the games frame.
+"""
+
+import numpy as np
+import pandas as pd
+
+from video_games.aggregates import category_codes
+from video_games.loader import SALES_COLUMNS
+
+CUBE_DIMENSIONS = ('platform', 'genre', 'rating', 'year_of_release')
+
+
+class SalesCube:
+    """Dense sales and game-count arrays with a slice/roll-up API.
+
+    ``sales`` has shape ``(platforms, genres, ratings, years, regions)`` and
+    ``counts`` the same shape without the region axis. The year axis ends with
+    a missing-year slot (label ``<NA>``) so totals still include games with
+    an unknown release year; year ranges never select it.
+    """
+
+    def __init__(self, labels, sales, counts, regions=tuple(SALES_COLUMNS)):
+        self.labels = dict(labels)
+        self.sales = sales
+        self.counts = counts
+        self.regions = list(regions)
+
+    @classmethod
+    def from_frame(cls, games, regions=tuple(SALES_COLUMNS)):
+        """Build the cube from a cleaned games frame in a single pass."""
+        labels = {dimension: _axis_labels(dimension, category_codes(games[dimension])[1])
+                  for dimension in CUBE_DIMENSIONS}
+        cube = cls.empty(labels, regions)
+        cube.add(games)
+        return cube
+
+    @classmethod
+    def empty(cls, labels, regions=tuple(SALES_COLUMNS)):
+        """Return an all-zero cube over the given axis labels."""
+        shape = tuple(len(labels[dimension]) for dimension in CUBE_DIMENSIONS)
+        return cls(labels, np.zeros(shape + (len(regions),)),
+                   np.zeros(shape, dtype=np.int64), regions)
+
+    def _codes(self, dimension, column):
+        index = self.labels[dimension]
+        if dimension == 'year_of_release':
+            known = index[:-1]
+            codes = known.get_indexer(column.astype('Int16'))
+            codes[column.isna().to_numpy()] = len(known)
+            return codes
+        return index.get_indexer(column)
+
+    def _grow(self, dimension, values):
+        """Extend one axis with labels first seen in ``values``.
+
+        Years are kept sorted so year ranges can be sliced; other labels are
+        appended, matching the append-only category dictionaries.
+        """
+        index = self.labels[dimension]
+        present = values.dropna().unique()
+        if dimension == 'year_of_release':
+            known = index[:-1]
+            unseen = pd.Index(present).astype('Int16').difference(known)
+            if unseen.empty:
+                return
+            grown = _axis_labels(dimension, known.append(unseen).sort_values())
+        else:
+            unseen = pd.Index(present).difference(index)
+            if unseen.empty:
+                return
+            grown = _axis_labels(dimension, index.append(unseen))
+
+        axis = CUBE_DIMENSIONS.index(dimension)
+        positions = grown.get_indexer(index)
+        if dimension == 'year_of_release':
+            positions[-1] = len(grown) - 1
+        for name in ('sales', 'counts'):
+            old = getattr(self, name)
+            shape = list(old.shape)
+            shape[axis] = len(grown)
+            new = np.zeros(shape, dtype=old.dtype)
+            target = [slice(None)] * old.ndim
+            target[axis] = positions
+            new[tuple(target)] = old
+            setattr(self, name, new)
+        self.labels[dimension] = grown
+
+    def add(self, games, sign=1):
+        """Add (``sign=1``) or remove (``sign=-1``) the rows of ``games`` in place.
+
+        Unseen platforms, genres, ratings or years grow the cube's axes, so an
+        incremental batch never needs a full rebuild.
+        """
+        for dimension in CUBE_DIMENSIONS:
+            self._grow(dimension, games[dimension])
+        codes = [self._codes(dimension, games[dimension]) for dimension in CUBE_DIMENSIONS]
+        shape = self.counts.shape
+        # Rows with an unknown platform, genre or rating cannot be placed.
+        valid = np.logical_and.reduce([dimension_codes >= 0 for dimension_codes in codes])
+        flat = np.ravel_multi_index([dimension_codes[valid] for dimension_codes in codes], shape)
+        size = self.counts.size
+
+        self.counts += sign * np.bincount(flat, minlength=size).reshape(shape)
+        for position, region in enumerate(self.regions):
+            weights = games[region].to_numpy(dtype=np.float64, na_value=0.0)[valid]
+            self.sales[..., position] += sign * np.bincount(
+                flat, weights=weights, minlength=size).reshape(shape)
+        return self
+
+    def merge(self, other):
+        """Add another cube's totals into this one in place, aligning labels.
+
+        Partial cubes built from separate chunks of the data combine into the
+        cube of the whole data set.
+        """
+        for dimension in CUBE_DIMENSIONS:
+            self._grow(dimension, pd.Series(other.labels[dimension]))
+        positions = []
+        for dimension in CUBE_DIMENSIONS:
+            dimension_positions = self.labels[dimension].get_indexer(other.labels[dimension])
+            if dimension == 'year_of_release':
+                dimension_positions[-1] = len(self.labels[dimension]) - 1
+            positions.append(dimension_positions)
+        region_positions = [self.regions.index(region) for region in other.regions]
+        self.counts[np.ix_(*positions)] += other.counts
+        self.sales[np.ix_(*positions, region_positions)] += other.sales
+        return self
+
+    @property
+    def dimensions(self):
+        return list(CUBE_DIMENSIONS)
+
+    def _axis_positions(self, dimension, selection):
+        index = self.labels[dimension]
+        if isinstance(selection, slice):
+            # Label based and inclusive at both ends, like DataFrame.loc.
+            known = index[index.notna()] if dimension == 'year_of_release' else index
+            positions = np.arange(len(known))[known.slice_indexer(selection.start, selection.stop)]
+            return positions
+        if np.ndim(selection) == 0:
+            selection = [selection]
+        positions = index.get_indexer(list(selection))
+        if (positions < 0).any():
+            missing = [value for value, position in zip(selection, positions) if position < 0]
+            raise KeyError(f'{missing} not found in {dimension}')
+        return positions
+
+    def slice(self, **selections):
+        """Return a sub-cube restricted to the selected labels.
+
+        Each keyword names a dimension and takes a label, a list of labels or a
+        label ``slice`` such as ``year_of_release=slice(1996, 2016)``.
+        """
+        labels = dict(self.labels)
+        sales = self.sales
+        counts = self.counts
+        for dimension, selection in selections.items():
+            if dimension not in CUBE_DIMENSIONS:
+                raise KeyError(f'unknown dimension {dimension!r}')
+            axis = CUBE_DIMENSIONS.index(dimension)
+            positions = self._axis_positions(dimension, selection)
+            labels[dimension] = labels[dimension][positions]
+            sales = np.take(sales, positions, axis=axis)
+            counts = np.take(counts, positions, axis=axis)
+        return SalesCube(labels, sales, counts, self.regions)
+
+    def _measure(self, region):
+        if region == 'count':
+            return self.counts
+        if region == 'total_sales':
+            return self.sales.sum(axis=-1)
+        return self.sales[..., self.regions.index(region)]
+
+    def rollup(self, keep=(), region='total_sales'):
+        """Sum out every dimension not in ``keep`` and return a Series.
+
+        ``region`` is one of the cube's sales regions, ``'total_sales'`` or
+        ``'count'`` for the number of games. With no ``keep`` dimensions the
+        grand total is returned as a scalar.
+        """
+        if isinstance(keep, str):
+            keep = [keep]
+        measure = self._measure(region)
+        drop = tuple(axis for axis, dimension in enumerate(CUBE_DIMENSIONS)
+                     if dimension not in keep)
+        reduced = measure.sum(axis=drop)
+        kept = [dimension for dimension in CUBE_DIMENSIONS if dimension in keep]
+        if not kept:
+            return reduced.item()
+        order = [kept.index(dimension) for dimension in keep]
+        reduced = np.transpose(reduced, order)
+        index = pd.MultiIndex.from_product([self.labels[dimension] for dimension in keep])
+        if len(keep) == 1:
+            index = index.get_level_values(0)
+        return pd.Series(reduced.ravel(), index=index, name=region)
+
+    def pivot(self, index, columns, region='total_sales'):
+        """Return a two-dimensional roll-up, e.g. years x platforms."""
+        return self.rollup([index, columns], region).unstack(columns)
+
+    def by_region(self, dimension):
+        """Return a categories x regions frame of sales totals."""
+        return pd.DataFrame({region: self.rollup([dimension], region) for region in self.regions})
+
+
+def _axis_labels(dimension, labels):
+    if dimension == 'year_of_release':
+        # Missing years get their own slot at the end of the axis.
+        known = pd.Index(labels).astype('Int16')
+        known = known[known.notna()]
+        return pd.Index(list(known) + [pd.NA], dtype='Int16', name=dimension)
+    return pd.Index(labels, name=dimension)
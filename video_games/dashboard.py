@@ -0,0 +1,78 @@
+"""Table builders behind the Streamlit dashboard (``streamlit run dashboard.py``).
+
+Every view the notebook computes with a fresh pandas filter (platform and
+genre leaders, yearly series, regional shares, rating splits) is answered
+here from one ``SalesCube``: a year window is a slice of the year axis and
+a view is a roll-up over the remaining axes, so each widget change costs a
+few small array sums. The dashboard script keeps one ``DashboardData`` per
+input file for all sessions and memoizes the finished tables per filter
+combination.
+"""
+
+import pandas as pd
+
+from video_games.aggregates import REGIONS
+from video_games.cube import SalesCube
+from video_games.loader import DATA_PATH, file_digest, load_games
+from video_games.trends import category_trends
+from video_games.windows import WindowIndex
+
+VIEW_DIMENSIONS = ('platform', 'genre', 'rating')
+
+
+class DashboardData:
+    """A sales cube plus the read-only views the dashboard displays."""
+
+    def __init__(self, cube, digest=None):
+        self.cube = cube
+        self.digest = digest
+        self._windows = {}
+
+    @classmethod
+    def from_path(cls, path=DATA_PATH):
+        """Load the games at ``path`` (snapshot-aware) and build the cube once."""
+        return cls(SalesCube.from_frame(load_games(path)), file_digest(path))
+
+    @property
+    def years(self):
+        """Return the ``(first, last)`` known release years."""
+        known = self.cube.labels['year_of_release'].dropna().astype(int)
+        return int(known.min()), int(known.max())
+
+    def _window(self, first, last):
+        return self.cube.slice(year_of_release=slice(first, last))
+
+    def leaders(self, dimension, region, first, last, top=5):
+        """Return the ``top`` categories with their sales, game count and share."""
+        window = self._window(first, last)
+        sales = window.rollup([dimension], region)
+        games = window.rollup([dimension], 'count')
+        table = pd.DataFrame({'sales': sales, 'games': games, 'share': sales / sales.sum()})
+        table = table[table['sales'] > 0].sort_values('sales', ascending=False)
+        return table.head(top).rename_axis(dimension)
+
+    def yearly(self, dimension, region, first, last, top=5):
+        """Return years x categories sales for the window's ``top`` categories."""
+        leaders = self.leaders(dimension, region, first, last, top).index
+        table = self._window(first, last).pivot('year_of_release', dimension, region)
+        table.index = table.index.astype(int)
+        return table[list(leaders)]
+
+    def region_shares(self, dimension, first, last, top=5, regions=REGIONS):
+        """Return category x region sales shares for every region's ``top`` categories."""
+        window = self._window(first, last)
+        sums = pd.DataFrame({region: window.rollup([dimension], region) for region in regions})
+        shares = sums / sums.sum()
+        leading = set()
+        for region in regions:
+            largest = shares[region].nlargest(top)
+            leading.update(largest.index[largest > 0])
+        shares = shares.loc[[label for label in shares.index if label in leading]]
+        return shares.sort_values(regions[-1], ascending=False).rename_axis(dimension)
+
+    def trends(self, dimension, region, last, window=5):
+        """Return the growth/shrink table of ``trends.category_trends`` for one region."""
+        if dimension not in self._windows:
+            self._windows[dimension] = WindowIndex.from_cube(self.cube, dimension)
+        result = category_trends(self._windows[dimension], dimension, window=window, last_year=last)
+        return result.loc[region].sort_values('rank')
@@ -0,0 +1,122 @@
+"""Detection and merging of implicit duplicate rows.
+
+The notebook looks for implicit duplicates with ``df_games['name'].duplicated()``
+and a ``groupby(['name', 'platform']).count()``, inspects three titles by hand
+and fixes only Sonic the Hedgehog's year; the sales of true duplicates are
+never merged. Here every row gets a 64-bit hash of its normalised
+(name, platform, year) key in one vectorised pass, rows sharing a hash form a
+duplicate group and each group is merged with per-column rules. Every merge
+is recorded in an audit frame.
+"""
+
+import pandas as pd
+
+from video_games.loader import SALES_COLUMNS
+
+# How each column of a duplicate group is combined. 'first' takes the first
+# non-missing value in row order, so a score present on either row survives.
+DEFAULT_RULES = {
+    'name': 'first',
+    'platform': 'first',
+    'year_of_release': 'first',
+    'genre': 'first',
+    'na_sales': 'sum',
+    'eu_sales': 'sum',
+    'jp_sales': 'sum',
+    'other_sales': 'sum',
+    'critic_score': 'first',
+    'user_score': 'first',
+    'rating': 'first',
+}
+
+
+def normalize_titles(names):
+    """Lowercase titles and strip punctuation and repeated whitespace."""
+    return (names.astype('object').str.lower()
+            .str.replace(r'[^\w\s]', ' ', regex=True)
+            .str.replace(r'\s+', ' ', regex=True)
+            .str.strip())
+
+
+def duplicate_keys(games):
+    """Return a uint64 hash of each row's normalised (name, platform, year) key.
+
+    A missing release year borrows the year of the other rows with the same
+    normalised name and platform when they agree on one year, which is how
+    the notebook matched the year-less Sonic the Hedgehog row to its twin.
+    Rows without a name get a key of 0 and are never treated as duplicates.
+    """
+    keys = pd.DataFrame({
+        'name': normalize_titles(games['name']),
+        'platform': games['platform'].astype('object'),
+        'year': games['year_of_release'].astype('Float64'),
+    }, index=games.index)
+
+    missing_year = keys['year'].isna()
+    if missing_year.any():
+        known = keys[~missing_year].groupby(['name', 'platform'])['year'].agg(['min', 'max'])
+        known = known.loc[known['min'] == known['max'], 'min'].rename('known_year')
+        borrowed = keys.loc[missing_year, ['name', 'platform']].join(known, on=['name', 'platform'])
+        keys.loc[missing_year, 'year'] = borrowed['known_year']
+
+    hashes = pd.util.hash_pandas_object(keys, index=False).to_numpy().copy()
+    hashes[keys['name'].isna().to_numpy()] = 0
+    return pd.Series(hashes, index=games.index, name='duplicate_key')
+
+
+def find_duplicates(games):
+    """Return the rows that belong to a duplicate group, with their group key."""
+    keys = duplicate_keys(games)
+    duplicated = keys.duplicated(keep=False).to_numpy() & (keys.to_numpy() != 0)
+    return games[duplicated].assign(duplicate_key=keys[duplicated]).sort_values('duplicate_key')
+
+
+def merge_duplicates(games, rules=None):
+    """Merge every duplicate group into a single row.
+
+    ``rules`` maps column names to a pandas aggregation ('sum', 'max',
+    'first', 'mean', ...) and overrides ``DEFAULT_RULES``. Columns without a
+    rule keep their first value. ``total_sales`` is derived again from the
+    merged regional sales. Returns ``(merged_games, audit)`` where ``audit``
+    has one row per merged group listing the original row labels, the label
+    kept and the sales before and after the merge.
+    """
+    rules = {**DEFAULT_RULES, **(rules or {})}
+    keys = duplicate_keys(games)
+    duplicated = keys.duplicated(keep=False).to_numpy() & (keys.to_numpy() != 0)
+    if not duplicated.any():
+        return games.copy(), _empty_audit()
+
+    groups = games[duplicated]
+    group_ids = keys[duplicated].to_numpy()
+    aggregations = {column: rules.get(column, 'first')
+                    for column in groups.columns if column != 'total_sales'}
+    merged = groups.groupby(group_ids, sort=False, observed=True).agg(aggregations)
+
+    labels = pd.Series(groups.index, index=group_ids).groupby(level=0, sort=False)
+    sales_before = groups[SALES_COLUMNS].sum(axis=1).groupby(group_ids, sort=False).sum()
+    audit = pd.DataFrame({
+        'duplicate_key': merged.index,
+        'name': merged['name'].to_numpy(),
+        'platform': merged['platform'].astype('object').to_numpy(),
+        'year_of_release': merged['year_of_release'].to_numpy(),
+        'rows': labels.agg(list).loc[merged.index].to_numpy(),
+        'kept': labels.first().loc[merged.index].to_numpy(),
+        'sales_before': sales_before.loc[merged.index].to_numpy(),
+        'sales_after': merged[SALES_COLUMNS].sum(axis=1).to_numpy(),
+    })
+
+    # Each merged row takes the place of its group's first row.
+    merged.index = audit['kept'].to_numpy()
+    if 'total_sales' in games.columns:
+        merged['total_sales'] = merged[SALES_COLUMNS].sum(axis=1)
+    merged = merged[games.columns].astype(games.dtypes.to_dict())
+
+    result = pd.concat([games[~duplicated], merged])
+    result = result.loc[games.index[games.index.isin(result.index)]]
+    return result, audit
+
+
+def _empty_audit():
+    return pd.DataFrame(columns=['duplicate_key', 'name', 'platform', 'year_of_release',
+                                 'rows', 'kept', 'sales_before', 'sales_after'])
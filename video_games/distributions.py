@@ -0,0 +1,98 @@
+"""Box-plot statistics per category from one sorted pass.
+
+Cells 44, 75 and 89 of the notebook add one column per genre or rating to
+the games frame (``relevant_multiplatform_games[genre] = ...``), gather them
+into a wide, mostly-NaN frame for ``DataFrame.plot(kind='box')`` and drop
+the columns again; that frame has as many cells as rows times categories.
+Here the values are sorted once by (category code, value). Quartiles are
+read at computed offsets inside each category's run, whisker ends follow
+from how many values fall inside the fences (a prefix and a suffix of each
+sorted run), and the fliers are the values outside. The result uses the
+``Axes.bxp`` dictionary layout, so matplotlib draws it without the raw data.
+"""
+
+import numpy as np
+import pandas as pd
+
+from video_games.aggregates import category_codes, sorted_quantile
+from video_games.missing import MaskedColumn
+
+WHISKER_RANGE = 1.5
+
+
+def box_table(games, dimension='genre', value='total_sales', keep=None, whis=WHISKER_RANGE,
+              include_fliers=True):
+    """Return box-plot statistics of ``value`` for every ``dimension`` category.
+
+    Missing values are skipped and ``keep`` can further restrict the rows,
+    e.g. ``games['na_sales'] > 0`` for a regional plot. Whiskers reach the
+    most extreme values within ``whis`` interquartile ranges of the box, as
+    in matplotlib. Returns one row per category that has values, with count,
+    mean, q1, median, q3, whisker ends, the number of fliers and, when
+    ``include_fliers`` is set, a ``fliers`` column of arrays.
+    """
+    codes, labels = category_codes(games[dimension])
+    column = MaskedColumn.from_series(games[value])
+    rows = column.valid & (codes >= 0)
+    if keep is not None:
+        rows &= np.asarray(keep, dtype=bool)
+    kept_codes = codes[rows]
+    kept_values = column.values[rows]
+
+    order = np.lexsort((kept_values, kept_codes))
+    sorted_codes = kept_codes[order]
+    sorted_values = kept_values[order]
+    n_groups = len(labels)
+    counts = np.bincount(sorted_codes, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = counts > 0
+
+    q1 = sorted_quantile(sorted_values, starts, counts, 0.25)
+    median = sorted_quantile(sorted_values, starts, counts, 0.5)
+    q3 = sorted_quantile(sorted_values, starts, counts, 0.75)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = np.bincount(sorted_codes, weights=sorted_values, minlength=n_groups) / counts
+    iqr = q3 - q1
+    low_fence = (q1 - whis * iqr)[sorted_codes]
+    high_fence = (q3 + whis * iqr)[sorted_codes]
+
+    # Within a sorted run the values below the low fence form a prefix and
+    # those above the high fence a suffix, so counts locate the whisker ends.
+    below = np.bincount(sorted_codes, weights=sorted_values < low_fence, minlength=n_groups)
+    above = np.bincount(sorted_codes, weights=sorted_values > high_fence, minlength=n_groups)
+    below = below.astype(np.int64)
+    above = above.astype(np.int64)
+    whisker_low = np.full(n_groups, np.nan)
+    whisker_high = np.full(n_groups, np.nan)
+    whisker_low[present] = sorted_values[(starts + below)[present]]
+    whisker_high[present] = sorted_values[(starts + counts - above - 1)[present]]
+    # matplotlib never lets a whisker fall inside the box.
+    whisker_low = np.minimum(whisker_low, q1)
+    whisker_high = np.maximum(whisker_high, q3)
+
+    table = pd.DataFrame({
+        'count': counts, 'mean': mean, 'q1': q1, 'median': median, 'q3': q3,
+        'whisker_low': whisker_low, 'whisker_high': whisker_high, 'n_fliers': below + above,
+    }, index=pd.Index(labels, name=dimension))
+    if include_fliers:
+        outside = (sorted_values < low_fence) | (sorted_values > high_fence)
+        flier_counts = np.bincount(sorted_codes[outside], minlength=n_groups)
+        table['fliers'] = np.split(sorted_values[outside], np.cumsum(flier_counts)[:-1])
+    return table[present]
+
+
+def box_stats(games, dimension='genre', value='total_sales', keep=None, whis=WHISKER_RANGE,
+              order='median'):
+    """Return ``Axes.bxp`` dictionaries, one per category.
+
+    ``order`` sorts the boxes by a ``box_table`` column (descending) or keeps
+    the category order when ``None``. Pass the result to
+    ``ax.bxp(stats, showfliers=...)`` or to ``rendering.box_spec``.
+    """
+    table = box_table(games, dimension, value, keep, whis)
+    if order is not None:
+        table = table.sort_values(order, ascending=False)
+    return [{
+        'label': str(label), 'mean': row.mean, 'med': row.median, 'q1': row.q1, 'q3': row.q3,
+        'whislo': row.whisker_low, 'whishi': row.whisker_high, 'fliers': row.fliers,
+    } for label, row in zip(table.index, table.itertuples(index=False))]
@@ -0,0 +1,121 @@
+"""Shared integer dictionaries for platform, genre and rating.
+
+The notebook keeps these fields as Python strings and filters with
+``df['platform'] == platform``, a string comparison over the whole column.
+Every frame produced by this package instead stores them as categoricals
+whose categories come from one append-only dictionary per column, so a
+label has the same small-integer code in the loader's frame, in every
+streamed chunk, in incremental batches and in the cube axes. Filters become
+integer comparisons on the codes.
+
+Code 0 is reserved for 'Unknown', which also absorbs the missing values and
+sentinels the notebook used ('tbd', -1, empty strings).
+"""
+
+import json
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+CATEGORY_COLUMNS = ('platform', 'genre', 'rating')
+UNKNOWN = 'Unknown'
+SENTINELS = ('', 'tbd', '-1', -1)
+
+SEED_PATH = Path(__file__).resolve().parent / 'dictionaries.json'
+
+
+class CategoryDictionaries:
+    """Append-only label lists for the categorical columns.
+
+    Codes never change once assigned, so frames encoded at different times
+    stay comparable. ``grew`` is set when an unseen label was appended;
+    nothing is written to disk unless the caller calls ``save``.
+    """
+
+    def __init__(self, labels=None):
+        labels = labels or {}
+        self.labels = {}
+        for column in CATEGORY_COLUMNS:
+            column_labels = [label for label in labels.get(column, []) if label != UNKNOWN]
+            self.labels[column] = [UNKNOWN] + column_labels
+        self.grew = False
+
+    @classmethod
+    def load(cls, path=None):
+        """Read dictionaries from ``path``, falling back to the shipped seed."""
+        candidates = [SEED_PATH] if path is None else [Path(path), SEED_PATH]
+        for candidate in candidates:
+            if candidate.exists():
+                with open(candidate) as handle:
+                    return cls(json.load(handle))
+        return cls()
+
+    @classmethod
+    def from_frame(cls, frame):
+        """Return the dictionaries a frame was encoded with, from its categories."""
+        return cls({column: list(frame[column].cat.categories)
+                    for column in CATEGORY_COLUMNS if column in frame.columns})
+
+    def save(self, path):
+        """Write the dictionaries to ``path``, e.g. ``loader.dictionary_path(cache_dir)``."""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # A unique temporary name keeps concurrent savers from clobbering
+        # each other's partial file.
+        with tempfile.NamedTemporaryFile('w', dir=path.parent, prefix=path.name, suffix='.tmp',
+                                         delete=False) as handle:
+            json.dump(self.labels, handle, indent=1)
+        Path(handle.name).replace(path)
+        self.grew = False
+
+    def dtype(self, column):
+        """Return the categorical dtype whose codes are the dictionary codes."""
+        return pd.CategoricalDtype(self.labels[column])
+
+    def _normalise(self, values):
+        values = pd.Series(values, copy=False).astype('object')
+        unknown = values.isna() | values.isin(SENTINELS)
+        return values.where(~unknown, UNKNOWN)
+
+    def encode(self, column, values):
+        """Return the int16 codes of ``values``, appending unseen labels."""
+        values = self._normalise(values)
+        index = pd.Index(self.labels[column])
+        codes = index.get_indexer(values)
+        if (codes < 0).any():
+            unseen = pd.unique(values[codes < 0])
+            self.labels[column].extend(unseen)
+            self.grew = True
+            codes = pd.Index(self.labels[column]).get_indexer(values)
+        return codes.astype(np.int16)
+
+    def decode(self, column, codes):
+        """Return the labels for an array of codes."""
+        return np.asarray(self.labels[column], dtype=object)[np.asarray(codes)]
+
+    def mask(self, frame, column, labels):
+        """Return a boolean row mask for ``labels`` by comparing integer codes.
+
+        Replaces ``frame[column] == label`` string comparisons; labels missing
+        from the dictionary select nothing.
+        """
+        if isinstance(labels, str):
+            labels = [labels]
+        codes = pd.Index(self.labels[column]).get_indexer(list(labels))
+        return np.isin(frame[column].cat.codes.to_numpy(), codes[codes >= 0])
+
+    def encode_frame(self, frame):
+        """Return ``frame`` with every category column recoded to the dictionaries."""
+        frame = frame.copy()
+        for column in CATEGORY_COLUMNS:
+            if column in frame.columns:
+                codes = self.encode(column, frame[column])
+                frame[column] = pd.Categorical.from_codes(codes, dtype=self.dtype(column))
+        return frame
+
+
+def load_dictionaries(path=None):
+    """Return the dictionaries saved at ``path``, or the shipped seed."""
+    return CategoryDictionaries.load(path)
@@ -0,0 +1,140 @@
+"""Precomputed row bitmaps for platform, genre, rating and year filters.
+
+Almost every notebook cell builds a fresh mask such as
+``(relevant_games['platform'] == popular_platform) & (relevant_games['year_of_release'] != -1)``,
+and cells 30, 31 and 33 rebuild the same masks inside loops, each one a
+scan of the column. ``FilterIndex`` scans each column once, groups the row
+ids of every value with one stable sort and stores them as bit-packed
+bitmaps (one bit per row, ``np.packbits``). A query combines bitmaps with
+``&``, ``|`` and ``~``, touching n/8 bytes per operand instead of the
+column, and only the final selection is expanded to row ids.
+"""
+
+import numpy as np
+import pandas as pd
+
+from video_games.aggregates import category_codes
+
+INDEX_COLUMNS = ('platform', 'genre', 'rating', 'year_of_release')
+
+
+class Bitmap:
+    """A packed set of row ids over ``n_rows`` rows."""
+
+    def __init__(self, words, n_rows):
+        self.words = words
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_rows(cls, rows, n_rows):
+        bits = np.zeros(n_rows, dtype=bool)
+        bits[rows] = True
+        return cls(np.packbits(bits), n_rows)
+
+    @classmethod
+    def empty(cls, n_rows):
+        return cls(np.zeros((n_rows + 7) // 8, dtype=np.uint8), n_rows)
+
+    def __and__(self, other):
+        return Bitmap(self.words & other.words, self.n_rows)
+
+    def __or__(self, other):
+        return Bitmap(self.words | other.words, self.n_rows)
+
+    def __sub__(self, other):
+        return Bitmap(self.words & ~other.words, self.n_rows)
+
+    def __invert__(self):
+        words = ~self.words
+        # Padding bits past the last row must stay clear.
+        spare = (-self.n_rows) % 8
+        if spare and len(words):
+            words[-1] &= np.uint8((0xFF << spare) & 0xFF)
+        return Bitmap(words, self.n_rows)
+
+    def __len__(self):
+        return int(np.unpackbits(self.words, count=self.n_rows).sum())
+
+    def mask(self):
+        """Return the selection as a boolean array of length ``n_rows``."""
+        return np.unpackbits(self.words, count=self.n_rows).view(bool)
+
+    def rows(self):
+        """Return the selected row positions in ascending order."""
+        return np.flatnonzero(self.mask())
+
+
+class FilterIndex:
+    """Per-value bitmaps of the indexed columns of one frame.
+
+    ``bitmaps[column]`` maps each label to its ``Bitmap``; rows with a missing
+    value are under ``None``. The index is only valid for the frame (and row
+    order) it was built from.
+    """
+
+    def __init__(self, bitmaps, n_rows):
+        self.bitmaps = bitmaps
+        self.n_rows = n_rows
+
+    @classmethod
+    def from_frame(cls, games, columns=INDEX_COLUMNS):
+        """Build the bitmaps of ``columns`` with one sort per column."""
+        n_rows = len(games)
+        bitmaps = {}
+        for column in columns:
+            codes, labels = category_codes(games[column])
+            order = np.argsort(codes, kind='stable')
+            counts = np.bincount(codes + 1, minlength=len(labels) + 1)
+            groups = np.split(order, np.cumsum(counts)[:-1])
+            column_bitmaps = {None: Bitmap.from_rows(groups[0], n_rows)}
+            for label, rows in zip(labels, groups[1:]):
+                if len(rows):
+                    column_bitmaps[label] = Bitmap.from_rows(rows, n_rows)
+            bitmaps[column] = column_bitmaps
+        return cls(bitmaps, n_rows)
+
+    def all(self):
+        return ~Bitmap.empty(self.n_rows)
+
+    def eq(self, column, label):
+        """Rows where ``column == label``; unknown labels select nothing."""
+        return self.bitmaps[column].get(label, Bitmap.empty(self.n_rows))
+
+    def isin(self, column, labels):
+        """Rows whose ``column`` is any of ``labels``."""
+        result = Bitmap.empty(self.n_rows)
+        for label in labels:
+            result = result | self.eq(column, label)
+        return result
+
+    def between(self, column, first, last):
+        """Rows whose ``column`` lies in ``first..last`` inclusive, e.g. release years."""
+        labels = [label for label in self.bitmaps[column]
+                  if label is not None and (first is None or label >= first)
+                  and (last is None or label <= last)]
+        return self.isin(column, labels)
+
+    def missing(self, column):
+        """Rows where ``column`` is missing."""
+        return self.bitmaps[column][None]
+
+    def select(self, **conditions):
+        """AND together one condition per column.
+
+        A value may be a label, a list of labels or an inclusive ``slice``,
+        e.g. ``select(platform='PS2', year_of_release=slice(1996, 2016))``.
+        """
+        result = self.all()
+        for column, condition in conditions.items():
+            if isinstance(condition, slice):
+                bitmap = self.between(column, condition.start, condition.stop)
+            elif isinstance(condition, (list, tuple, set, pd.Index, np.ndarray)):
+                bitmap = self.isin(column, condition)
+            else:
+                bitmap = self.eq(column, condition)
+            result = result & bitmap
+        return result
+
+    def take(self, games, bitmap):
+        """Return the rows of ``games`` selected by ``bitmap``."""
+        return games.iloc[bitmap.rows()]
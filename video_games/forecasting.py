@@ -0,0 +1,129 @@
+"""Next-year sales forecasts for every platform x genre x region series.
+
+The notebook stops at the 1996-2016 ``relevant_games`` filter of cell 32 and
+never forecasts the 2017 campaign year. Here the yearly totals of every
+series come from one ``SalesCube`` roll-up, and each series gets a linear
+trend on ``log1p`` sales over its most recent years. All trends are ordinary
+least-squares fits that share the same year grid, so a block of series is
+fitted with a handful of column-wise array reductions; blocks can be spread
+over a process pool. Prediction intervals use the residual spread and the
+t distribution of each fit.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from video_games.aggregates import REGIONS
+from video_games.cube import SalesCube
+from video_games.streaming import RELEVANT_YEARS
+
+TARGET_YEAR = 2017
+HISTORY_YEARS = 6
+# Residual degrees of freedom a trend needs before it is used at all.
+MIN_DOF = 3
+FORECAST_DIMENSIONS = ('platform', 'genre')
+
+
+def yearly_panel(source, dimensions=FORECAST_DIMENSIONS, regions=REGIONS, years=RELEVANT_YEARS):
+    """Return a years x (region, *dimensions) table of yearly sales totals.
+
+    ``source`` is a cleaned games frame or a ``SalesCube``; ``years`` is an
+    inclusive ``(first, last)`` range. Series without any sales are dropped.
+    """
+    cube = source if isinstance(source, SalesCube) else SalesCube.from_frame(source)
+    cube = cube.slice(year_of_release=slice(*years))
+    keep = ['year_of_release', *dimensions]
+    panel = pd.concat({region: cube.rollup(keep, region).unstack(list(dimensions))
+                       for region in regions}, axis=1, names=['region'])
+    panel.index = panel.index.astype(np.int64)
+    return panel.loc[:, panel.sum(axis=0) > 0]
+
+
+def _fit_trends(years, log_sales, weights, target_year, ci):
+    # Column-wise OLS of log_sales on year over the rows with weight 1, with
+    # a prediction interval at target_year.
+    n = weights.sum(axis=0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean_year = weights.T @ years / n
+        means = (weights * log_sales).sum(axis=0) / n
+        centred = (years[:, None] - mean_year) * weights
+        sxx = (centred ** 2).sum(axis=0)
+        slopes = (centred * (log_sales - means)).sum(axis=0) / sxx
+        residual = weights * (log_sales - means - centred * slopes)
+        dof = n - 2
+        residual_sd = np.sqrt((residual ** 2).sum(axis=0) / dof)
+        offset = target_year - mean_year
+        point = means + slopes * offset
+        spread = (stats.t.ppf((1 + ci) / 2, dof) * residual_sd
+                  * np.sqrt(1 + 1 / n + offset ** 2 / sxx))
+    # Too short for a trustworthy trend: carry the last year forward without
+    # an interval.
+    short = dof < MIN_DOF
+    point[short] = log_sales[-1, short]
+    slopes[short] = 0.0
+    spread[short] = np.nan
+    residual_sd[short] = np.nan
+    return np.stack([point, point - spread, point + spread, slopes, residual_sd])
+
+
+def forecast_series(series, target_year=TARGET_YEAR, history=HISTORY_YEARS, ci=0.95,
+                    workers=None):
+    """Forecast every column of a years x series table for ``target_year``.
+
+    Each column's last ``history`` years are fitted with a log-linear trend;
+    missing years count as zero sales. A series' first year of sales is a
+    partial launch year, so it and every year before it are ignored; a
+    platform launched inside the window is otherwise read as explosive
+    growth. Series left with fewer than ``MIN_DOF + 2`` years carry their
+    last year forward with no interval. Returns one row per column with the
+    point forecast, the ``ci`` prediction interval (all in sales units,
+    floored at zero), the yearly growth factor implied by the slope and the
+    last observed year's sales. ``workers`` fits column blocks in a process pool.
+    """
+    if history < MIN_DOF + 2:
+        raise ValueError(f'history must cover at least {MIN_DOF + 2} years')
+    series = series.sort_index()
+    years = np.arange(series.index.max() - history + 1, series.index.max() + 1)
+    recent = series.reindex(years).fillna(0)
+    log_sales = np.log1p(recent.to_numpy(dtype=np.float64))
+    # Launch year of every series over its whole history, not just the window.
+    sold = series.fillna(0).to_numpy(dtype=np.float64) > 0
+    launch = np.where(sold.any(axis=0), series.index.to_numpy()[sold.argmax(axis=0)], np.inf)
+    weights = (years[:, None] > launch).astype(np.float64)
+    years = years.astype(np.float64)
+
+    blocks = np.array_split(np.arange(log_sales.shape[1]), max(1, workers or 1))
+    blocks = [block for block in blocks if len(block)]
+    if len(blocks) <= 1:
+        results = [_fit_trends(years, log_sales, weights, target_year, ci)]
+    else:
+        with ProcessPoolExecutor(max_workers=len(blocks)) as pool:
+            futures = [pool.submit(_fit_trends, years, log_sales[:, block], weights[:, block],
+                                   target_year, ci)
+                       for block in blocks]
+            results = [future.result() for future in futures]
+    point, lower, upper, slopes, residual_sd = np.concatenate(results, axis=1)
+
+    return pd.DataFrame({
+        'forecast': np.expm1(point).clip(min=0),
+        'lower': np.expm1(lower).clip(min=0),
+        'upper': np.expm1(upper).clip(min=0),
+        'growth': np.exp(slopes),
+        'residual_sd': residual_sd,
+        'last_sales': recent.iloc[-1].to_numpy(dtype=np.float64),
+    }, index=series.columns)
+
+
+def forecast_sales(source, target_year=TARGET_YEAR, dimensions=FORECAST_DIMENSIONS,
+                   regions=REGIONS, years=RELEVANT_YEARS, **kwargs):
+    """Forecast ``target_year`` sales of every region x ``dimensions`` series.
+
+    With the defaults this is every platform x genre combination in each
+    region and in total, trained on the 1996-2016 yearly totals. Keyword
+    arguments go to ``forecast_series``.
+    """
+    panel = yearly_panel(source, dimensions, regions, years)
+    return forecast_series(panel, target_year, **kwargs)
@@ -0,0 +1,237 @@
+"""Pairwise hypothesis tests across every platform or genre at once.
+
+Cells 99 and 100 of the notebook run a single ``stats.ttest_ind`` each (Xbox
+vs PC user scores, Action vs Sports), building both samples with fresh
+boolean filters. Here the count, mean and variance of every group come from
+one grouped pass over category codes, and Student/Welch t-tests for all
+pairs are evaluated as array operations on those sufficient statistics.
+Mann-Whitney U tests reuse one sort of the values per group, permutation
+tests shuffle the group labels of all rows once per replicate and score
+every pair from the same shuffle, and p-values can be corrected for
+multiple comparisons.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from video_games.aggregates import category_codes
+from video_games.missing import MaskedColumn
+from video_games.resampling import MEMORY_BUDGET, replicate_block
+
+TESTS = ('welch', 'student', 'mannwhitney', 'permutation')
+CORRECTIONS = ('holm', 'bonferroni', 'fdr_bh', None)
+
+
+def group_moments(codes, n_groups, column):
+    """Return ``(count, mean, variance)`` arrays per group, skipping missing values.
+
+    The variance uses ``ddof=1`` and is NaN for groups with fewer than two values.
+    """
+    keep = column.valid & (codes >= 0)
+    kept_codes = codes[keep]
+    values = column.values[keep]
+    counts = np.bincount(kept_codes, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        means = np.bincount(kept_codes, weights=values, minlength=n_groups) / counts
+        squares = np.bincount(kept_codes, weights=(values - means[kept_codes]) ** 2,
+                              minlength=n_groups)
+        variances = np.where(counts > 1, squares / (counts - 1), np.nan)
+    return counts, means, variances
+
+
+def _pair_indices(n_groups):
+    return np.triu_indices(n_groups, k=1)
+
+
+def ttest_pairs(counts, means, variances, equal_var=False):
+    """Two-sided t-tests for every pair of groups from their moments.
+
+    Returns ``(statistic, pvalue)`` arrays over the upper-triangle pairs.
+    """
+    left, right = _pair_indices(len(counts))
+    n1, n2 = counts[left].astype(float), counts[right].astype(float)
+    v1, v2 = variances[left], variances[right]
+    difference = means[left] - means[right]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        if equal_var:
+            dof = n1 + n2 - 2
+            pooled = ((n1 - 1) * v1 + (n2 - 1) * v2) / dof
+            error = np.sqrt(pooled * (1 / n1 + 1 / n2))
+        else:
+            a, b = v1 / n1, v2 / n2
+            error = np.sqrt(a + b)
+            dof = (a + b) ** 2 / (a ** 2 / (n1 - 1) + b ** 2 / (n2 - 1))
+        statistic = difference / error
+    return statistic, 2 * stats.t.sf(np.abs(statistic), dof)
+
+
+def _sorted_groups(codes, n_groups, column):
+    keep = column.valid & (codes >= 0)
+    kept_codes = codes[keep]
+    values = column.values[keep]
+    order = np.lexsort((values, kept_codes))
+    counts = np.bincount(kept_codes, minlength=n_groups)
+    return np.split(values[order], np.cumsum(counts)[:-1])
+
+
+def mannwhitney_pairs(groups):
+    """Two-sided Mann-Whitney U tests (normal approximation, tie corrected).
+
+    ``groups`` is a list of sorted arrays; returns ``(U, pvalue)`` over the
+    upper-triangle pairs.
+    """
+    left, right = _pair_indices(len(groups))
+    u_values = np.full(len(left), np.nan)
+    p_values = np.full(len(left), np.nan)
+    for pair, (first, second) in enumerate(zip(left, right)):
+        x, y = groups[first], groups[second]
+        n1, n2 = len(x), len(y)
+        if n1 == 0 or n2 == 0:
+            continue
+        # U counts the pairs where x beats y, ties counting one half.
+        below = np.searchsorted(y, x, side='left')
+        not_above = np.searchsorted(y, x, side='right')
+        u = (below + not_above).sum() / 2
+        _, ties = np.unique(np.concatenate((x, y)), return_counts=True)
+        n = n1 + n2
+        variance = n1 * n2 / 12 * ((n + 1) - (ties ** 3 - ties).sum() / (n * (n - 1)))
+        if variance <= 0:
+            continue
+        z = (abs(u - n1 * n2 / 2) - 0.5) / np.sqrt(variance)
+        u_values[pair] = u
+        p_values[pair] = min(1.0, 2 * stats.norm.sf(z))
+    return u_values, p_values
+
+
+def permutation_pairs(codes, n_groups, column, n_permutations=1000, seed=None,
+                      budget=MEMORY_BUDGET):
+    """Permutation p-values for the difference in means of every pair.
+
+    Each replicate shuffles the group labels of all valid rows once; group
+    sizes are unchanged, so every pair's permuted difference comes from the
+    same ``np.bincount`` over the shuffled labels. Replicates are processed
+    in blocks sized to keep their temporaries within ``budget`` bytes.
+    """
+    keep = column.valid & (codes >= 0)
+    kept_codes = codes[keep]
+    values = column.values[keep]
+    counts = np.bincount(kept_codes, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        observed = np.bincount(kept_codes, weights=values, minlength=n_groups) / counts
+    left, right = _pair_indices(n_groups)
+    observed_gap = np.abs(observed[left] - observed[right])
+
+    # Shuffled labels, offsets and tiled values per row; gaps per pair.
+    block = replicate_block(24 * len(values) + 24 * len(left), budget)
+    rng = np.random.default_rng(seed)
+    exceed = np.zeros(len(left))
+    done = 0
+    while done < n_permutations:
+        size = min(block, n_permutations - done)
+        shuffled = rng.permuted(np.broadcast_to(kept_codes, (size, len(kept_codes))), axis=1)
+        offsets = shuffled + n_groups * np.arange(size)[:, None]
+        sums = np.bincount(offsets.ravel(), weights=np.tile(values, size),
+                           minlength=size * n_groups).reshape(size, n_groups)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = sums / counts
+        gaps = np.abs(means[:, left] - means[:, right])
+        exceed += (gaps >= observed_gap - 1e-12).sum(axis=0)
+        done += size
+    p_values = (exceed + 1) / (n_permutations + 1)
+    p_values[np.isnan(observed_gap)] = np.nan
+    return observed[left] - observed[right], p_values
+
+
+def adjust_pvalues(p_values, method='holm'):
+    """Correct a 1-D array of p-values for multiple comparisons.
+
+    ``method`` is 'holm', 'bonferroni', 'fdr_bh' (Benjamini-Hochberg) or
+    ``None``. NaN p-values are ignored and stay NaN.
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = np.full_like(p_values, np.nan)
+    present = ~np.isnan(p_values)
+    p = p_values[present]
+    m = len(p)
+    if method is None or m == 0:
+        adjusted[present] = p
+        return adjusted
+    if method == 'bonferroni':
+        adjusted[present] = np.minimum(p * m, 1)
+        return adjusted
+    order = np.argsort(p)
+    ranked = p[order]
+    if method == 'holm':
+        scaled = np.maximum.accumulate(ranked * (m - np.arange(m)))
+    elif method == 'fdr_bh':
+        scaled = np.minimum.accumulate((ranked * m / np.arange(1, m + 1))[::-1])[::-1]
+    else:
+        raise ValueError(f'unknown correction {method!r}, expected one of {CORRECTIONS}')
+    result = np.empty(m)
+    result[order] = np.minimum(scaled, 1)
+    adjusted[present] = result
+    return adjusted
+
+
+def _pairwise(codes, labels, column, tests, correction, min_count, n_permutations, seed):
+    n_groups = len(labels)
+    counts, means, variances = group_moments(codes, n_groups, column)
+    left, right = _pair_indices(n_groups)
+    base = pd.DataFrame({
+        'group_a': labels[left], 'group_b': labels[right],
+        'n_a': counts[left], 'n_b': counts[right],
+        'mean_a': means[left], 'mean_b': means[right],
+    })
+    enough = (counts[left] >= min_count) & (counts[right] >= min_count)
+
+    frames = []
+    for test in tests:
+        if test in ('welch', 'student'):
+            statistic, p_values = ttest_pairs(counts, means, variances, equal_var=test == 'student')
+        elif test == 'mannwhitney':
+            statistic, p_values = mannwhitney_pairs(_sorted_groups(codes, n_groups, column))
+        elif test == 'permutation':
+            statistic, p_values = permutation_pairs(codes, n_groups, column, n_permutations, seed)
+        else:
+            raise ValueError(f'unknown test {test!r}, expected one of {TESTS}')
+        p_values = np.where(enough, p_values, np.nan)
+        frames.append(base.assign(test=test, statistic=statistic, pvalue=p_values,
+                                  pvalue_adjusted=adjust_pvalues(p_values, correction))[enough])
+    return pd.concat(frames, ignore_index=True)
+
+
+def pairwise_tests(games, dimension='platform', value='user_score', tests=TESTS,
+                   correction='holm', by=None, min_count=2, n_permutations=1000, seed=None):
+    """Test the difference in ``value`` for every pair of ``dimension`` categories.
+
+    ``value`` is any numeric column (a score or a regional sales column);
+    missing values are skipped. With ``by`` (e.g. 'year_of_release') the
+    tests run separately within each group of that column and the result
+    gains a ``by`` column. Returns one row per pair and test, with raw and
+    corrected p-values; ``pvalue_matrix`` turns it into a square table.
+    """
+    codes, labels = category_codes(games[dimension])
+    labels = np.asarray(labels, dtype=object)
+    column = MaskedColumn.from_series(games[value])
+    if by is None:
+        return _pairwise(codes, labels, column, tests, correction, min_count,
+                         n_permutations, seed)
+
+    by_codes, by_labels = category_codes(games[by])
+    frames = []
+    for position, label in enumerate(by_labels):
+        rows = by_codes == position
+        result = _pairwise(codes[rows], labels, column.take(rows), tests, correction,
+                           min_count, n_permutations, seed)
+        frames.append(result.assign(by=label))
+    return pd.concat(frames, ignore_index=True)
+
+
+def pvalue_matrix(results, test='welch', column='pvalue_adjusted'):
+    """Pivot ``pairwise_tests`` output into a symmetric groups x groups table."""
+    rows = results[results['test'] == test]
+    matrix = rows.pivot(index='group_a', columns='group_b', values=column)
+    groups = matrix.index.union(matrix.columns)
+    matrix = matrix.reindex(index=groups, columns=groups)
+    return matrix.combine_first(matrix.T)
@@ -0,0 +1,241 @@
+"""Incremental ingestion of weekly sales deltas.
+
+The notebook can only re-read the whole CSV and redo every step. ``GameStore``
+keeps the cleaned games frame together with its ``SalesCube`` and applies an
+append/upsert batch keyed on (name, platform, year_of_release): the batch goes
+through the same cleaning rules, the rows it replaces are subtracted from the
+cube and the new rows are added, so the platform, genre, rating and yearly
+totals stay current without a rebuild. A hash index of the stored keys finds
+the replaced rows, and only the batch is encoded, so the cost of a batch
+follows its own size rather than the size of the store.
+"""
+
+import json
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from video_games.correlation import grouped_correlations
+from video_games.cube import CUBE_DIMENSIONS, SalesCube
+from video_games.dedup import merge_duplicates
+from video_games.encoding import CATEGORY_COLUMNS, CategoryDictionaries, load_dictionaries
+from video_games.loader import (
+    COLUMN_NAMES,
+    CSV_DTYPES,
+    DATA_PATH,
+    SALES_COLUMNS,
+    load_games,
+)
+
+KEY_COLUMNS = ['name', 'platform', 'year_of_release']
+
+
+def prepare_batch(batch, games=None, dictionaries=None):
+    """Clean a batch of new or updated rows with the loader's rules.
+
+    ``batch`` may use the raw CSV column names or the lowercase ones. 'tbd'
+    user scores become missing, missing release years are repaired from rows
+    of the same game and platform in the batch or in ``games``, and
+    ``total_sales`` is derived. Categories are encoded with ``dictionaries``
+    (by default those of ``games``, else the shipped seed), which grow in
+    memory only.
+    """
+    batch = batch.rename(columns=COLUMN_NAMES).copy()
+    dtypes = {COLUMN_NAMES[column]: dtype for column, dtype in CSV_DTYPES.items()}
+    batch['user_score'] = pd.to_numeric(batch['user_score'].replace('tbd', np.nan), errors='coerce')
+    for column, dtype in dtypes.items():
+        if dtype == 'category':
+            continue
+        if column in ('year_of_release', 'critic_score'):
+            batch[column] = pd.to_numeric(batch[column], errors='coerce').round().astype(dtype)
+        else:
+            batch[column] = batch[column].astype(dtype)
+    if dictionaries is None:
+        dictionaries = (load_dictionaries() if games is None
+                        else CategoryDictionaries.from_frame(games))
+    batch = dictionaries.encode_frame(batch)
+
+    missing = batch['year_of_release'].isna()
+    if missing.any():
+        sources = [batch.loc[~missing, KEY_COLUMNS]]
+        if games is not None:
+            # Only stored rows of the same titles can supply a year.
+            related = games['name'].isin(batch.loc[missing, 'name'])
+            related &= games['year_of_release'].notna()
+            sources.append(games.loc[related.to_numpy(), KEY_COLUMNS])
+        known = pd.concat(sources)
+        known = known.assign(platform=known['platform'].astype('object'))
+        known_years = known.groupby(['name', 'platform'])['year_of_release'].min()
+        lookup = batch.loc[missing, ['name', 'platform']].join(
+            known_years.rename('known_year'), on=['name', 'platform'])
+        batch.loc[missing, 'year_of_release'] = lookup['known_year'].astype('Int16')
+
+    batch['total_sales'] = batch[SALES_COLUMNS].sum(axis=1).astype('float32')
+    return batch
+
+
+def _key_frame(frame):
+    keys = frame[KEY_COLUMNS].astype('object')
+    return keys.where(keys.notna(), None)
+
+
+def _key_hashes(frame):
+    # 64-bit hash of each row's key; categoricals hash by label, not by code.
+    return pd.util.hash_pandas_object(frame[KEY_COLUMNS], index=False).to_numpy()
+
+
+class GameStore:
+    """Cleaned games frame plus the sales cube kept in step with it.
+
+    ``dictionaries`` encode the categories of every batch; they start from
+    the stored frame's categories and are saved only by ``save``.
+
+    Every stored row with a name must have its own (name, platform,
+    year_of_release) key, otherwise an upsert could not tell which row a
+    batch row replaces. Rows without a name are never replaced. ``rows``
+    maps the key hash of every named row to its position in ``games``.
+    """
+
+    def __init__(self, games, cube=None, dictionaries=None):
+        games = games.reset_index(drop=True)
+        named = games['name'].notna().to_numpy()
+        hashes = _key_hashes(games)
+        duplicated = pd.Series(hashes).duplicated(keep=False).to_numpy() & named
+        if duplicated.any():
+            keys = games.loc[duplicated, KEY_COLUMNS].drop_duplicates()
+            name, platform, year = keys.iloc[0]
+            raise ValueError(f'{len(keys)} keys occur more than once, e.g. {name!r} on '
+                             f'{platform} ({year}); merge them with merge_duplicates first')
+        self.dictionaries = (dictionaries if dictionaries is not None
+                             else CategoryDictionaries.from_frame(games))
+        self.games = _align_categories(games, self.dictionaries)
+        self.cube = cube if cube is not None else SalesCube.from_frame(self.games)
+        positions = np.flatnonzero(named)
+        self.rows = dict(zip(hashes[positions].tolist(), positions.tolist()))
+
+    @classmethod
+    def from_csv(cls, path=DATA_PATH, **kwargs):
+        """Create a store from the full CSV through the snapshot-aware loader.
+
+        Duplicate rows of the CSV, such as the two PS3 Sonic the Hedgehog
+        rows, are merged with ``merge_duplicates``.
+        """
+        games, _ = merge_duplicates(load_games(path, **kwargs))
+        return cls(games)
+
+    def upsert(self, batch):
+        """Apply a batch of new or corrected rows and update the cube in place.
+
+        Rows whose key already exists replace the stored row; other rows,
+        including rows without a name, are appended. Returns a
+        ``(inserted, updated)`` tuple of row counts.
+        """
+        batch = prepare_batch(batch, self.games, self.dictionaries)
+        # The last occurrence of a key inside one batch wins.
+        batch = batch[~_key_frame(batch).duplicated(keep='last').to_numpy()].reset_index(drop=True)
+
+        # Rows without a name have no usable key and are never matched.
+        named = batch['name'].notna().to_numpy()
+        positions = np.array([self.rows.get(key, -1) if present else -1
+                              for key, present in zip(_key_hashes(batch).tolist(), named)],
+                             dtype=np.int64)
+        matched = positions >= 0
+        if matched.any():
+            # Confirm the keys behind equal hashes really are equal.
+            stored = _key_frame(self.games.iloc[positions[matched]]).to_numpy()
+            same = (stored == _key_frame(batch[matched]).to_numpy()).all(axis=1)
+            matched[np.flatnonzero(matched)[~same]] = False
+        replaced = positions[matched]
+
+        if len(replaced):
+            self.cube.add(self.games.iloc[replaced], sign=-1)
+        self.cube.add(batch)
+
+        games = _align_categories(self.games, self.dictionaries)
+        if len(replaced):
+            updates = batch[matched]
+            for position, column in enumerate(games.columns):
+                games.iloc[replaced, position] = updates[column].to_numpy()
+        appended = batch[~matched]
+        if len(appended):
+            start = len(games)
+            games = pd.concat([games, appended[games.columns]], ignore_index=True)
+            new_rows = np.arange(start, len(games))[appended['name'].notna().to_numpy()]
+            self.rows.update(zip(_key_hashes(games.iloc[new_rows]).tolist(), new_rows.tolist()))
+        self.games = games
+        updated = len(replaced)
+        return len(batch) - updated, updated
+
+    def yearly_series(self, dimension='platform', region='total_sales'):
+        """Return the years x categories sales table, e.g. yearly platform sales."""
+        return self.cube.slice(year_of_release=slice(None, None)).pivot(
+            'year_of_release', dimension, region)
+
+    def correlations(self, by='platform', **kwargs):
+        """Return review/sales correlations per ``by`` category for the current rows.
+
+        Recomputed from ``games`` on each call, so the matrix reflects every
+        batch applied so far; keyword arguments go to ``grouped_correlations``.
+        """
+        return grouped_correlations(self.games, by=by, **kwargs)
+
+    def save(self, directory):
+        """Write the games frame, the cube arrays and the dictionaries under ``directory``."""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        self.games.to_pickle(directory / 'games.pkl')
+        np.savez(directory / 'cube.npz', sales=self.cube.sales, counts=self.cube.counts)
+        labels = {dimension: [None if pd.isna(label) else _plain(label)
+                              for label in self.cube.labels[dimension]]
+                  for dimension in CUBE_DIMENSIONS}
+        with open(directory / 'cube.json', 'w') as handle:
+            json.dump({'labels': labels, 'regions': self.cube.regions}, handle)
+        self.dictionaries.save(directory / 'dictionaries.json')
+
+    @classmethod
+    def open(cls, directory):
+        """Load a store previously written by ``save``."""
+        directory = Path(directory)
+        games = pd.read_pickle(directory / 'games.pkl')
+        arrays = np.load(directory / 'cube.npz')
+        with open(directory / 'cube.json') as handle:
+            meta = json.load(handle)
+        labels = {}
+        for dimension in CUBE_DIMENSIONS:
+            values = meta['labels'][dimension]
+            if dimension == 'year_of_release':
+                years = [pd.NA if value is None else value for value in values]
+                labels[dimension] = pd.Index(years, dtype='Int16', name=dimension)
+            else:
+                labels[dimension] = pd.Index(values, name=dimension)
+        cube = SalesCube(labels, arrays['sales'], arrays['counts'], meta['regions'])
+        dictionaries = None
+        if (directory / 'dictionaries.json').exists():
+            dictionaries = CategoryDictionaries.load(directory / 'dictionaries.json')
+        return cls(games, cube, dictionaries)
+
+
+def _plain(value):
+    return value.item() if hasattr(value, 'item') else value
+
+
+def _align_categories(games, dictionaries):
+    # Give the stored categoricals the (grown) dictionary categories so that
+    # batches concatenate without falling back to object. Dictionaries only
+    # append, so the stored categories are normally a prefix and the codes
+    # stay as they are; anything else is recoded once.
+    columns = {}
+    for column in CATEGORY_COLUMNS:
+        if column not in games.columns:
+            continue
+        current = list(games[column].cat.categories)
+        labels = dictionaries.labels[column]
+        if current == labels:
+            continue
+        if current == labels[:len(current)]:
+            columns[column] = games[column].cat.add_categories(labels[len(current):])
+        else:
+            codes = dictionaries.encode(column, games[column])
+            columns[column] = pd.Categorical.from_codes(codes, dtype=dictionaries.dtype(column))
+    return games.assign(**columns) if columns else games
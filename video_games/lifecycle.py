@@ -0,0 +1,143 @@
+"""Launch, peak and decline curves for every platform's yearly sales.
+
+Cells 31 and 33 of the notebook draw one subplot per platform and read the
+lifecycle ("popular for about 7 years, relevant for 10") off the charts by
+eye. Here each yearly series is fitted with the rise-and-decay curve
+``a * t**k * exp(-t / theta)``, ``t`` counting years since launch. Its
+logarithm is linear in ``(log a, k, 1 / theta)``, so every series is fitted
+at once by stacking the 3x3 weighted normal equations of all series and
+solving them in one batched call. Peak, half-life and end of life follow
+from the fitted parameters, with the crossing points found by a bisection
+that runs over all series together.
+"""
+
+import numpy as np
+import pandas as pd
+
+from video_games.cube import SalesCube
+
+LAUNCH_FRACTION = 0.01
+END_FRACTION = 0.05
+MIN_YEARS = 3
+BISECTION_STEPS = 60
+MAX_LIFETIME = 100
+
+
+def _launch_positions(sales):
+    # A platform launches in its first year with a noticeable share of its
+    # best year, which skips stray rows dated long before the hardware.
+    threshold = LAUNCH_FRACTION * sales.max(axis=0)
+    above = (sales > threshold) & (sales > 0)
+    return np.where(above.any(axis=0), above.argmax(axis=0), -1)
+
+
+def _fit_log_linear(t, log_sales, weights):
+    # Stacked normal equations X'WX beta = X'Wy, one 3x3 system per series.
+    design = np.stack([np.ones_like(t), np.log(t), -t], axis=-1)
+    lhs = np.einsum('ys,ysi,ysj->sij', weights, design, design)
+    rhs = np.einsum('ys,ysi,ys->si', weights, design, log_sales)
+    return np.einsum('sij,sj->si', np.linalg.pinv(lhs), rhs)
+
+
+def _crossing(k, rate, t_peak, log_fraction):
+    # Solve k*log(t/t_peak) - rate*(t - t_peak) = log_fraction for t > t_peak.
+    def drop(t):
+        return k * np.log(t / t_peak) - rate * (t - t_peak)
+
+    lower = t_peak.copy()
+    upper = np.minimum(t_peak + 1, MAX_LIFETIME)
+    for _ in range(int(np.log2(MAX_LIFETIME)) + 1):
+        upper = np.where(drop(upper) > log_fraction, np.minimum(2 * upper, MAX_LIFETIME), upper)
+    for _ in range(BISECTION_STEPS):
+        middle = (lower + upper) / 2
+        above = drop(middle) > log_fraction
+        lower = np.where(above, middle, lower)
+        upper = np.where(above, upper, middle)
+    return np.where(drop(upper) <= log_fraction, upper, np.nan)
+
+
+def fit_lifecycles(series, end_fraction=END_FRACTION, min_years=MIN_YEARS):
+    """Fit the lifecycle curve to every column of a years x series table.
+
+    ``series`` is indexed by year, e.g. ``GameStore.yearly_series()``. Years
+    before launch and years without sales are left out of the fit, which is
+    weighted by sales so the tail of tiny late releases does not dominate.
+    Returns one row per column with the fitted parameters, the launch year,
+    the fitted peak year, the half-life in years after the peak, the year
+    sales fall below ``end_fraction`` of the peak and the R² of the fit.
+    Series with fewer than ``min_years`` years of sales, or that are still
+    rising, get NaN where the quantity is undefined.
+    """
+    years = series.index.to_numpy(dtype=np.float64)
+    sales = series.fillna(0).to_numpy(dtype=np.float64)
+    launch = _launch_positions(sales)
+    launch_year = np.where(launch >= 0, years[np.maximum(launch, 0)], np.nan)
+
+    t = years[:, None] - launch_year[None, :] + 1
+    used = (sales > 0) & (t >= 1)
+    n_years = used.sum(axis=0)
+    fitted = n_years >= min_years
+    safe_t = np.where(used, t, 1.0)
+    log_sales = np.log(np.where(used, sales, 1.0))
+    weights = np.where(used & fitted, sales, 0.0)
+
+    log_a, k, rate = np.full((3, sales.shape[1]), np.nan)
+    if fitted.any():
+        log_a[fitted], k[fitted], rate[fitted] = _fit_log_linear(
+            safe_t[:, fitted], log_sales[:, fitted], weights[:, fitted]).T
+
+    declining = fitted & (rate > 0)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t_peak = np.where(declining, np.maximum(k / rate, 1.0), np.nan)
+        curve = np.exp(log_a + k * np.log(safe_t) - rate * safe_t)
+        residual = np.where(used, sales - curve, 0.0)
+        mean_sales = np.where(used, sales, 0.0).sum(axis=0) / n_years
+        spread = np.where(used, sales - mean_sales, 0.0)
+        r_squared = 1 - (residual ** 2).sum(axis=0) / (spread ** 2).sum(axis=0)
+
+    t_half = np.full(len(k), np.nan)
+    t_end = np.full(len(k), np.nan)
+    if declining.any():
+        k_d, rate_d, peak_d = k[declining], rate[declining], t_peak[declining]
+        t_half[declining] = _crossing(k_d, rate_d, peak_d, np.log(0.5))
+        t_end[declining] = _crossing(k_d, rate_d, peak_d, np.log(end_fraction))
+
+    peak_sales = np.exp(log_a + k * np.log(t_peak) - rate * t_peak)
+    return pd.DataFrame({
+        'launch_year': launch_year,
+        'peak_year': launch_year + t_peak - 1,
+        'peak_sales': peak_sales,
+        'half_life': t_half - t_peak,
+        'end_of_life': launch_year + t_end - 1,
+        'a': np.exp(log_a),
+        'k': k,
+        'theta': 1 / rate,
+        'n_years': n_years,
+        'r_squared': np.where(fitted, r_squared, np.nan),
+    }, index=series.columns)
+
+
+def lifecycle_curves(fits, years):
+    """Evaluate fitted curves at ``years``; returns a years x series frame."""
+    years = np.asarray(years, dtype=np.float64)
+    t = years[:, None] - fits['launch_year'].to_numpy()[None, :] + 1
+    with np.errstate(invalid='ignore', divide='ignore'):
+        values = fits['a'].to_numpy() * t ** fits['k'].to_numpy() * np.exp(
+            -t / fits['theta'].to_numpy())
+    return pd.DataFrame(np.where(t >= 1, values, 0.0),
+                        index=pd.Index(years, name='year_of_release'), columns=fits.index)
+
+
+def platform_lifecycles(source, region='total_sales', by=None, dimension='platform', **kwargs):
+    """Fit the lifecycle of every platform from a games frame or a ``SalesCube``.
+
+    ``region`` picks the sales column; with ``by`` (e.g. 'genre') every
+    (by, platform) series is fitted in the same batch and the result is
+    indexed by both. Keyword arguments go to ``fit_lifecycles``.
+    """
+    cube = source if isinstance(source, SalesCube) else SalesCube.from_frame(source)
+    cube = cube.slice(year_of_release=slice(None, None))
+    keep = ['year_of_release', dimension] if by is None else ['year_of_release', by, dimension]
+    series = cube.rollup(keep, region).unstack(keep[1:])
+    series = series.loc[:, series.sum(axis=0) > 0]
+    return fit_lifecycles(series, **kwargs)
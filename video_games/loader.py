@@ -0,0 +1,192 @@
+"""Typed loading of the games dataset with a cached columnar snapshot.
+
+The notebook reads the CSV with default dtypes and then renames, replaces
+'tbd'/NaN with -1 and calls ``astype`` several times, copying every column on
+each step. Here the CSV is parsed once with an explicit dtype map, cleaned in
+place and written to an uncompressed Arrow (Feather) snapshot named after the
+CSV's hash. Later runs memory-map that snapshot instead of parsing again.
+"""
+
+import hashlib
+import tempfile
+from pathlib import Path
+
+import pandas as pd
+
+from video_games.encoding import CATEGORY_COLUMNS, load_dictionaries
+
+try:
+    import pyarrow as pa
+    from pyarrow import feather
+except ImportError:  # snapshots are an optimisation, the CSV path still works
+    pa = None
+    feather = None
+
+
+DATA_PATH = Path(__file__).resolve().parent.parent / 'moved_games.csv'
+CACHE_DIR = Path(__file__).resolve().parent.parent / '.cache'
+
+# Bump whenever clean_games changes so old snapshots are not served.
+SNAPSHOT_VERSION = 2
+
+COLUMN_NAMES = {
+    'Name': 'name',
+    'Platform': 'platform',
+    'Year_of_Release': 'year_of_release',
+    'Genre': 'genre',
+    'NA_sales': 'na_sales',
+    'EU_sales': 'eu_sales',
+    'JP_sales': 'jp_sales',
+    'Other_sales': 'other_sales',
+    'Critic_Score': 'critic_score',
+    'User_Score': 'user_score',
+    'Rating': 'rating',
+}
+
+CSV_DTYPES = {
+    'Platform': 'category',
+    'Year_of_Release': 'Int16',
+    'Genre': 'category',
+    'NA_sales': 'float32',
+    'EU_sales': 'float32',
+    'JP_sales': 'float32',
+    'Other_sales': 'float32',
+    'Critic_Score': 'Int16',
+    'User_Score': 'Float32',
+    'Rating': 'category',
+}
+
+# 'tbd' user scores carry no more information than a missing one.
+CSV_NA_VALUES = {'User_Score': ['tbd']}
+
+SALES_COLUMNS = ['na_sales', 'eu_sales', 'jp_sales', 'other_sales']
+
+
+def file_digest(path, chunk_size=1 << 20):
+    """Return the SHA-256 hex digest of the file at ``path``."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_games_csv(path=DATA_PATH, **kwargs):
+    """Parse the raw games CSV with the typed column map and lowercase names.
+
+    Extra keyword arguments go straight to ``pd.read_csv`` (e.g. ``chunksize``).
+    """
+    frame = pd.read_csv(path, dtype=CSV_DTYPES, na_values=CSV_NA_VALUES, **kwargs)
+    if isinstance(frame, pd.DataFrame):
+        return frame.rename(columns=COLUMN_NAMES)
+    return (chunk.rename(columns=COLUMN_NAMES) for chunk in frame)
+
+
+def repair_years(games):
+    """Fill a missing release year from another row of the same game and platform.
+
+    This generalises the notebook's hand fix for Sonic the Hedgehog, whose PS3
+    duplicate without a year was given the 2006 year of its twin.
+    """
+    missing = games['year_of_release'].isna()
+    if not missing.any():
+        return games['year_of_release']
+    known_years = (
+        games.loc[~missing]
+        .groupby(['name', 'platform'], observed=True)['year_of_release']
+        .min()
+        .rename('known_year')
+    )
+    lookup = games.loc[missing, ['name', 'platform']].join(known_years, on=['name', 'platform'])
+    years = games['year_of_release'].copy()
+    years.loc[missing] = lookup['known_year'].astype(years.dtype)
+    return years
+
+
+def dictionary_path(cache_dir=CACHE_DIR):
+    """Return where the category dictionaries for ``cache_dir`` are saved."""
+    return Path(cache_dir) / 'dictionaries.json'
+
+
+def clean_games(games, dictionaries=None):
+    """Apply the notebook's preprocessing rules to a renamed, typed frame.
+
+    Platform, genre and rating are recoded to ``dictionaries`` (the shipped
+    seed by default), with missing values becoming 'Unknown'; unseen labels
+    are appended to ``dictionaries`` but not saved. Missing release years
+    are repaired from duplicates where possible and ``total_sales`` is
+    derived. Missing scores and years stay as nullable NA rather than -1.
+    """
+    if dictionaries is None:
+        dictionaries = load_dictionaries()
+    games = dictionaries.encode_frame(games)
+    games['year_of_release'] = repair_years(games)
+    games['total_sales'] = games[SALES_COLUMNS].sum(axis=1).astype('float32')
+    return games
+
+
+def _snapshot_path(digest, cache_dir):
+    return Path(cache_dir) / f'games-{digest[:16]}-v{SNAPSHOT_VERSION}.feather'
+
+
+def write_snapshot(games, path):
+    """Write ``games`` as an uncompressed Feather file at ``path``, atomically."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(games, preserve_index=False)
+    # A temporary name of its own, so concurrent writers of the same
+    # snapshot never rename each other's half-written file into place.
+    with tempfile.NamedTemporaryFile(dir=path.parent, prefix=path.name, suffix='.tmp',
+                                     delete=False) as handle:
+        tmp_path = Path(handle.name)
+    try:
+        # Uncompressed so the file can be memory-mapped without decoding.
+        feather.write_feather(table, tmp_path, compression='uncompressed')
+        tmp_path.replace(path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def read_snapshot(path):
+    """Read a snapshot written by ``write_snapshot`` through a memory map.
+
+    Arrow maps the file, but converting to pandas copies the columns into
+    the returned frame.
+    """
+    table = feather.read_table(path, memory_map=True)
+    return table.to_pandas()
+
+
+def _recode(games, dictionaries):
+    # Snapshot codes match ``dictionaries`` unless the category lists differ.
+    if all(list(games[column].cat.categories) == dictionaries.labels[column]
+           for column in CATEGORY_COLUMNS):
+        return games
+    return dictionaries.encode_frame(games)
+
+
+def load_games(path=DATA_PATH, cache_dir=CACHE_DIR, use_snapshot=True, dictionaries=None):
+    """Return the cleaned games frame, served from a snapshot when possible.
+
+    The snapshot is keyed by the CSV's SHA-256, so editing the CSV produces a
+    new snapshot instead of serving stale data. Without pyarrow installed, or
+    with ``use_snapshot=False``, the CSV is parsed and cleaned every time.
+    ``dictionaries`` defaults to the ones saved at ``dictionary_path(cache_dir)``
+    and the frame always comes back in their codes, including when it is
+    served from a snapshot encoded with other dictionaries. Labels new to
+    them are added in memory only, so call
+    ``dictionaries.save(dictionary_path(cache_dir))`` to keep their codes.
+    """
+    if dictionaries is None:
+        dictionaries = load_dictionaries(dictionary_path(cache_dir))
+    if not use_snapshot or feather is None:
+        return clean_games(read_games_csv(path), dictionaries)
+
+    snapshot = _snapshot_path(file_digest(path), cache_dir)
+    if snapshot.exists():
+        return _recode(read_snapshot(snapshot), dictionaries)
+
+    games = clean_games(read_games_csv(path), dictionaries)
+    write_snapshot(games, snapshot)
+    return games
@@ -0,0 +1,93 @@
+"""Missing-aware storage and kernels for scores and release years.
+
+Cell 6 of the notebook replaces missing user scores, critic scores and
+release years with -1. Every later step then has to filter ``!= -1`` again,
+building a fresh boolean mask per query, and steps that forget (the per-year
+user score means of cell 38) silently average the -1s in. The loader keeps
+these columns as nullable dtypes instead; ``MaskedColumn`` splits such a
+column once into a plain float array and a validity mask so the grouped
+kernels below skip missing values without rebuilding the mask.
+"""
+
+import numpy as np
+import pandas as pd
+
+from video_games.aggregates import category_codes, grouped_stats
+
+NULLABLE_DTYPES = {
+    'year_of_release': 'Int16',
+    'critic_score': 'Int16',
+    'user_score': 'Float32',
+}
+SCORE_COLUMNS = ['critic_score', 'user_score']
+
+
+def from_sentinels(frame, sentinel=-1):
+    """Convert a notebook-style frame using ``sentinel`` for missing values.
+
+    'tbd' user scores are treated as missing too. Returns a copy with the
+    nullable dtypes the loader uses.
+    """
+    frame = frame.copy()
+    for column, dtype in NULLABLE_DTYPES.items():
+        if column not in frame.columns:
+            continue
+        values = pd.to_numeric(frame[column].replace('tbd', np.nan), errors='coerce')
+        frame[column] = values.mask(values == sentinel).astype(dtype)
+    return frame
+
+
+class MaskedColumn:
+    """A numeric column as float64 values plus a validity mask.
+
+    Missing entries hold NaN in ``values`` and ``False`` in ``valid``; the mask
+    is computed once when the column is created.
+    """
+
+    def __init__(self, values, valid):
+        self.values = values
+        self.valid = valid
+
+    @classmethod
+    def from_series(cls, series):
+        valid = series.notna().to_numpy()
+        values = series.to_numpy(dtype=np.float64, na_value=np.nan)
+        return cls(values, valid)
+
+    def count(self):
+        return int(self.valid.sum())
+
+    def mean(self):
+        count = self.count()
+        return self.values[self.valid].sum() / count if count else np.nan
+
+    def take(self, rows):
+        """Return the column restricted to ``rows`` (a mask or positions)."""
+        return MaskedColumn(self.values[rows], self.valid[rows])
+
+
+def masked_columns(frame, columns=tuple(NULLABLE_DTYPES)):
+    """Split every nullable column of ``frame`` into a ``MaskedColumn``."""
+    return {column: MaskedColumn.from_series(frame[column])
+            for column in columns if column in frame.columns}
+
+
+def grouped_summary(codes, n_groups, column):
+    """Count, mean and quartiles of the valid entries of ``column`` per group."""
+    return grouped_stats(codes, n_groups, column.values, keep=column.valid)
+
+
+def score_summary(games, dimension, scores=SCORE_COLUMNS, columns=None):
+    """Return per-category statistics of each score, ignoring missing scores.
+
+    ``columns`` may pass precomputed ``masked_columns`` so repeated summaries
+    over different dimensions share one set of validity masks. The result has
+    one row per category and ``(score, statistic)`` columns.
+    """
+    if columns is None:
+        columns = masked_columns(games, scores)
+    codes, labels = category_codes(games[dimension])
+    table = pd.concat({score: grouped_summary(codes, len(labels), columns[score])
+                       for score in scores}, axis=1)
+    table.index = pd.Index(labels, name=dimension)
+    return table
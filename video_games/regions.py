@@ -0,0 +1,81 @@
+"""Region profiles for any number of sales territories from one aggregate pass.
+
+Cells 50-98 of the notebook repeat the same section three times, for
+``na_sales``, ``eu_sales`` and ``jp_sales``: re-filter
+``relevant_games[relevant_games['x_sales'] > 0]``, total and count every
+platform, draw a pie of the top five, then do the same for genres and
+ratings. ``region_report`` computes the statistics of every region,
+including ``other_sales``, any extra territory columns and custom regions
+summed from them, in a single ``aggregate`` call, and ``RegionReport``
+slices the per-region profiles out of it.
+"""
+
+import pandas as pd
+
+from video_games.aggregates import REGIONS, aggregate
+from video_games.streaming import RELEVANT_YEARS
+
+PROFILE_DIMENSIONS = ('platform', 'genre', 'rating')
+TOP_N = 5
+
+
+class RegionReport:
+    """Per-region platform, genre and rating profiles over a shared ``AggregateCube``."""
+
+    def __init__(self, cube, regions):
+        self.cube = cube
+        self.regions = list(regions)
+
+    def leaders(self, region, dimension='platform', top=TOP_N):
+        """Return the ``top`` categories of a region by sales.
+
+        Columns are the sales sum, the number of games that sold there, the
+        median sales per game and the share of the region's total, which is
+        what the notebook's pie charts show.
+        """
+        table = self.cube.table(dimension, region)
+        sold = table[table['count'] > 0]
+        result = sold[['sum', 'count', 'median']].assign(share=sold['sum'] / sold['sum'].sum())
+        return result.sort_values('sum', ascending=False).head(top)
+
+    def profile(self, region, top=TOP_N):
+        """Return ``{dimension: leaders}`` for one region; ratings are never cut."""
+        return {dimension: self.leaders(region, dimension,
+                                        top=None if dimension == 'rating' else top)
+                for dimension in PROFILE_DIMENSIONS}
+
+    def profiles(self, top=TOP_N):
+        """Return the profile of every region, keyed by region."""
+        return {region: self.profile(region, top) for region in self.regions}
+
+    def rankings(self, dimension='platform', top=TOP_N):
+        """Return a rank x regions table of the leading categories side by side."""
+        ranks = range(1, top + 1)
+        columns = {}
+        for region in self.regions:
+            leaders = self.leaders(region, dimension, top).index
+            columns[region] = pd.Series(leaders, index=ranks[:len(leaders)]).reindex(ranks)
+        return pd.DataFrame(columns).rename_axis('rank')
+
+    def shares(self, dimension='platform'):
+        """Return a categories x regions table of each category's share of sales."""
+        sums = self.cube.stat(dimension, 'sum')[self.regions]
+        shares = sums / sums.sum()
+        return shares[(sums > 0).any(axis=1)]
+
+
+def region_report(games, regions=REGIONS, custom_regions=None, years=RELEVANT_YEARS):
+    """Build a ``RegionReport`` for ``regions`` plus ``custom_regions``.
+
+    ``regions`` names sales columns of ``games`` (any number of
+    territories); ``custom_regions`` maps new names to the columns they sum,
+    e.g. ``{'western': ['na_sales', 'eu_sales']}``. Only games released in
+    the inclusive ``years`` window are profiled; ``None`` keeps every row.
+    As in the notebook, a game counts toward a region only where it sold.
+    """
+    if years is not None:
+        released = games['year_of_release']
+        inside = (released >= years[0]) & (released <= years[1])
+        games = games[inside.to_numpy(dtype=bool, na_value=False)]
+    cube = aggregate(games, PROFILE_DIMENSIONS, regions, custom_regions)
+    return RegionReport(cube, list(regions) + list(custom_regions or {}))
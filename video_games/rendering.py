@@ -0,0 +1,258 @@
+"""Headless, parallel rendering of the report's charts.
+
+The notebook draws every chart with ``plt.show()`` one after another: the
+ten-platform overlay of cell 30, the subplot grids of cells 31 and 33 (each
+panel re-filtering the frame) and the same platform, genre and rating charts
+repeated for North America, Europe and Japan. Here a ``FigureSpec`` holds
+only the plotted arrays and layout, built from the cube's precomputed
+roll-ups. Specs are rendered to files with matplotlib's Agg backend in a
+process pool, and a manifest of content digests lets a re-run skip every
+figure whose data and options have not changed.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from video_games.aggregates import REGIONS
+from video_games.cube import SalesCube
+from video_games.loader import load_games
+from video_games.streaming import RELEVANT_YEARS
+
+KINDS = ('line', 'bar', 'barh', 'pie', 'box')
+FORMATS = ('png',)
+MANIFEST_NAME = 'manifest.json'
+REGION_TITLES = {'na_sales': 'North America', 'eu_sales': 'Europe', 'jp_sales': 'Japan',
+                 'other_sales': 'Other Regions', 'total_sales': 'All Regions'}
+
+
+class FigureSpec:
+    """Data and layout of one figure, cheap to pickle into a worker.
+
+    ``panels`` is a list of ``(title, series)`` pairs, one per subplot, where
+    ``series`` maps a legend label to an ``(x, y)`` pair of arrays. ``kind``
+    is one of ``KINDS``; the remaining options apply to every panel.
+    """
+
+    def __init__(self, name, panels, kind='line', title=None, ncols=1, xlabel=None,
+                 ylabel=None, xlim=None, ylim=None, panel_size=(4.0, 3.0)):
+        if kind not in KINDS:
+            raise ValueError(f'unknown kind {kind!r}, expected one of {KINDS}')
+        self.name = name
+        self.panels = [(panel_title, {label: (np.asarray(x), np.asarray(y, dtype=np.float64))
+                                      for label, (x, y) in series.items()})
+                       for panel_title, series in panels]
+        self.kind = kind
+        self.title = title
+        self.ncols = ncols
+        self.xlabel = xlabel
+        self.ylabel = ylabel
+        self.xlim = xlim
+        self.ylim = ylim
+        self.panel_size = panel_size
+
+    def digest(self):
+        """Return a SHA-256 digest of the plotted data and every option."""
+        digest = hashlib.sha256()
+        options = (self.kind, self.title, self.ncols, self.xlabel, self.ylabel,
+                   self.xlim, self.ylim, self.panel_size)
+        digest.update(pickle.dumps(options))
+        for panel_title, series in self.panels:
+            digest.update(repr(panel_title).encode())
+            for label, (x, y) in series.items():
+                digest.update(repr(label).encode())
+                digest.update(repr(x.tolist()).encode() if x.dtype == object else x.tobytes())
+                digest.update(y.tobytes())
+        return digest.hexdigest()
+
+
+def _draw_boxes(axis, series):
+    # Box series carry the fliers as x and (whislo, q1, med, q3, whishi, mean) as y.
+    stats = [{'label': label, 'whislo': y[0], 'q1': y[1], 'med': y[2], 'q3': y[3],
+              'whishi': y[4], 'mean': y[5], 'fliers': x} for label, (x, y) in series.items()]
+    try:
+        axis.bxp(stats, orientation='horizontal')
+    except TypeError:  # matplotlib < 3.10
+        axis.bxp(stats, vert=False)
+
+
+def _draw(axis, spec, series):
+    if spec.kind == 'box':
+        _draw_boxes(axis, series)
+        series = {}
+    for label, (x, y) in series.items():
+        if spec.kind == 'line':
+            axis.plot(x, y, label=label)
+        elif spec.kind == 'bar':
+            axis.bar([str(value) for value in x], y, label=label)
+            axis.tick_params(axis='x', labelrotation=90)
+        elif spec.kind == 'barh':
+            axis.barh([str(value) for value in x], y, label=label)
+        else:
+            axis.pie(y, labels=[str(value) for value in x], autopct='%1.1f%%')
+    if spec.kind == 'line' and len(series) > 1:
+        axis.legend(fontsize='small')
+    if spec.xlim is not None:
+        axis.set_xlim(*spec.xlim)
+    if spec.ylim is not None:
+        axis.set_ylim(*spec.ylim)
+    if spec.xlabel:
+        axis.set_xlabel(spec.xlabel)
+    if spec.ylabel:
+        axis.set_ylabel(spec.ylabel)
+
+
+def _render(spec, directory, formats):
+    # Draws on an Agg canvas without pyplot, so neither the caller's backend
+    # nor pyplot's figure registry is touched.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    ncols = max(1, min(spec.ncols, len(spec.panels)))
+    nrows = -(-len(spec.panels) // ncols)
+    width, height = spec.panel_size
+    figure = Figure(figsize=(width * ncols, height * nrows))
+    FigureCanvasAgg(figure)
+    axes = figure.subplots(nrows, ncols, squeeze=False)
+    for axis, (panel_title, series) in zip(axes.ravel(), spec.panels):
+        _draw(axis, spec, series)
+        if panel_title:
+            axis.set_title(panel_title)
+    for axis in axes.ravel()[len(spec.panels):]:
+        axis.set_visible(False)
+    if spec.title:
+        figure.suptitle(spec.title)
+    figure.tight_layout()
+    paths = []
+    for extension in formats:
+        path = Path(directory) / f'{spec.name}.{extension}'
+        figure.savefig(path)
+        paths.append(str(path))
+    return paths
+
+
+def render_report(specs, directory, formats=FORMATS, workers=None, force=False):
+    """Render ``specs`` into ``directory`` and return ``{name: status}``.
+
+    A spec is 'skipped' when the manifest records the same digest and all of
+    its files exist, otherwise it is 'rendered'. ``workers`` sets the
+    process pool size; ``None`` or 1 renders in this process.
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest_path = directory / MANIFEST_NAME
+    manifest = json.loads(manifest_path.read_text()) if manifest_path.exists() else {}
+
+    digests = {spec.name: spec.digest() for spec in specs}
+    stale = [spec for spec in specs
+             if force or manifest.get(spec.name) != digests[spec.name]
+             or not all((directory / f'{spec.name}.{extension}').exists() for extension in formats)]
+    if stale and (workers or 1) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            for future in [pool.submit(_render, spec, directory, formats) for spec in stale]:
+                future.result()
+    else:
+        for spec in stale:
+            _render(spec, directory, formats)
+
+    manifest.update({spec.name: digests[spec.name] for spec in stale})
+    # A unique temporary name so concurrent renders never swap in a partial manifest.
+    with tempfile.NamedTemporaryFile('w', dir=directory, prefix=MANIFEST_NAME, suffix='.tmp',
+                                     delete=False) as handle:
+        json.dump(manifest, handle, indent=1, sort_keys=True)
+    Path(handle.name).replace(manifest_path)
+    stale_names = {spec.name for spec in stale}
+    return {spec.name: 'rendered' if spec.name in stale_names else 'skipped' for spec in specs}
+
+
+def yearly_specs(series, name, title=None, ncols=3, ylim=None, xlim=None):
+    """Return an overlay and a one-panel-per-column grid of a years x categories table.
+
+    These replace cell 30 (all platforms on one axis) and cells 31/33
+    (one subplot per platform).
+    """
+    years = series.index.to_numpy()
+    columns = {str(column): (years, series[column].to_numpy()) for column in series.columns}
+    overlay = FigureSpec(f'{name}_overlay', [(title, columns)], kind='line', xlabel='Year',
+                         ylabel='Total Sales (USD)', xlim=xlim, panel_size=(8.0, 5.0))
+    grid = FigureSpec(f'{name}_grid',
+                      [(f'{label} Sales', {label: values}) for label, values in columns.items()],
+                      kind='line', ncols=ncols, xlim=xlim, ylim=ylim)
+    return [overlay, grid]
+
+
+def ranking_spec(values, name, title=None, kind='bar', ylabel='Total Sales (USD)'):
+    """Return a single-panel spec of a category -> value Series, largest first."""
+    values = values.sort_values(ascending=False)
+    return FigureSpec(name, [(title, {values.name or 'value': (values.index.to_numpy(dtype=object),
+                                                               values.to_numpy())})],
+                      kind=kind, ylabel=ylabel if kind == 'bar' else None,
+                      panel_size=(6.0, 4.0))
+
+
+def box_spec(stats, name, title=None, showfliers=True, xlabel='Total Sales (USD)'):
+    """Return a horizontal box-plot spec from ``distributions.box_stats`` output."""
+    series = {box['label']: (box['fliers'] if showfliers else np.empty(0),
+                             [box['whislo'], box['q1'], box['med'], box['q3'], box['whishi'],
+                              box['mean']])
+              for box in stats}
+    return FigureSpec(name, [(title, series)], kind='box', xlabel=xlabel,
+                      panel_size=(8.0, 0.4 * len(series) + 1.5))
+
+
+def _report_tables(cube, regions, years, top):
+    # The roll-ups every report chart is drawn from, cheap to cache.
+    relevant = cube.slice(year_of_release=slice(*years))
+    yearly = relevant.pivot('year_of_release', 'platform')
+    yearly = yearly.loc[:, yearly.sum() > 0]
+    yearly.index = yearly.index.astype(np.int64)
+    tables = {'yearly': yearly}
+    for region in regions:
+        for dimension in ('platform', 'genre'):
+            totals = relevant.rollup([dimension], region)
+            tables[region, dimension] = totals[totals > 0].sort_values(ascending=False).head(top)
+        ratings = relevant.rollup(['rating'], region)
+        tables[region, 'rating'] = ratings[ratings > 0]
+    return tables
+
+
+def report_specs(source, regions=REGIONS, years=RELEVANT_YEARS, top=5, cache=None):
+    """Build the specs of the whole report from a games frame, a ``SalesCube`` or a CSV path.
+
+    One roll-up of the cube feeds the yearly platform charts and, for every
+    region, the top platform and genre bars, their pie charts and the
+    rating bars. With a CSV path, ``cache`` (a ``ResultCache``) keeps the
+    roll-ups keyed on the file's digest, so a re-run after a chart-only
+    change neither loads the CSV nor builds the cube.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        def compute():
+            return _report_tables(SalesCube.from_frame(load_games(source)), regions, years, top)
+        if cache is None:
+            tables = compute()
+        else:
+            tables = cache.memoize('report_tables', compute, path=source, regions=list(regions),
+                                   years=list(years), top=top)
+    else:
+        cube = source if isinstance(source, SalesCube) else SalesCube.from_frame(source)
+        tables = _report_tables(cube, regions, years, top)
+
+    specs = yearly_specs(tables['yearly'], 'platform_sales', 'Platform Sales by Year', ncols=6,
+                         ylim=(0, 250), xlim=(years[0] - 1, years[1] + 2))
+    for region in regions:
+        region_title = REGION_TITLES.get(region, region)
+        for dimension in ('platform', 'genre'):
+            leaders = tables[region, dimension]
+            specs.append(ranking_spec(leaders, f'{region}_{dimension}_top',
+                                      f'{region_title}: Top {top} {dimension.title()}s'))
+            specs.append(ranking_spec(leaders, f'{region}_{dimension}_share',
+                                      f'{region_title}: {dimension.title()} Share', kind='pie'))
+        specs.append(ranking_spec(tables[region, 'rating'], f'{region}_rating',
+                                  f'{region_title}: Sales by Rating'))
+    return specs
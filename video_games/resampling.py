@@ -0,0 +1,178 @@
+"""Batched bootstrap and permutation resampling.
+
+The notebook's only uncertainty estimates are single t-tests (cells 38-39 and
+99-100). The functions here draw thousands of replicates as index matrices
+and reduce them with array operations, a block of replicates at a time.
+Block sizes follow from a memory budget and the sample size, so a million
+rows draw a few replicates per block instead of allocating gigabytes.
+Replicates can be sharded across a process pool; each shard gets an
+independent seed spawned from the caller's seed, so results are
+reproducible for a given seed and worker count.
+"""
+
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from video_games.aggregates import category_codes
+from video_games.loader import SALES_COLUMNS
+from video_games.missing import MaskedColumn
+
+# Bytes the temporaries of one block of replicates may take.
+MEMORY_BUDGET = 256 * 1024 * 1024
+STATISTICS = {
+    'mean': lambda samples: samples.mean(axis=1),
+    'median': lambda samples: np.median(samples, axis=1),
+}
+
+
+def replicate_block(bytes_per_replicate, budget=MEMORY_BUDGET):
+    """Return how many replicates fit in ``budget`` bytes of temporaries, at least one."""
+    return max(1, int(budget // max(bytes_per_replicate, 1)))
+
+
+def _shard_sizes(n_replicates, workers):
+    shards = max(1, min(workers or 1, n_replicates))
+    sizes = np.full(shards, n_replicates // shards)
+    sizes[:n_replicates % shards] += 1
+    return sizes
+
+
+def _run_sharded(kernel, args, n_replicates, seed, workers):
+    # Run ``kernel(*args, size, seed)`` over shards and stack the replicates.
+    sizes = _shard_sizes(n_replicates, workers)
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    if len(sizes) == 1:
+        return kernel(*args, int(sizes[0]), seeds[0])
+    with ProcessPoolExecutor(max_workers=len(sizes)) as pool:
+        futures = [pool.submit(kernel, *args, int(size), shard_seed)
+                   for size, shard_seed in zip(sizes, seeds)]
+        return np.concatenate([future.result() for future in futures])
+
+
+def _group_replicates(groups, statistic, n_replicates, seed):
+    # Resample every group with replacement; returns (replicates, groups).
+    rng = np.random.default_rng(seed)
+    reduce = STATISTICS[statistic]
+    result = np.full((n_replicates, len(groups)), np.nan)
+    for position, values in enumerate(groups):
+        if len(values) == 0:
+            continue
+        # Row indices, the gathered values and the median's sorted copy.
+        block = replicate_block(24 * len(values))
+        for first in range(0, n_replicates, block):
+            size = min(block, n_replicates - first)
+            rows = rng.integers(0, len(values), size=(size, len(values)))
+            result[first:first + size, position] = reduce(values[rows])
+    return result
+
+
+def _share_replicates(codes, n_groups, sales, n_replicates, seed):
+    # Resample games with replacement; returns (replicates, groups, regions).
+    rng = np.random.default_rng(seed)
+    n_rows, n_regions = sales.shape
+    result = np.empty((n_replicates, n_groups, n_regions))
+    # Row indices, their codes and offsets, and one region's gathered sales.
+    block = replicate_block(32 * n_rows)
+    for first in range(0, n_replicates, block):
+        size = min(block, n_replicates - first)
+        rows = rng.integers(0, n_rows, size=(size, n_rows))
+        offsets = (codes[rows] + n_groups * np.arange(size)[:, None]).ravel()
+        for region in range(n_regions):
+            totals = np.bincount(offsets, weights=sales[rows, region].ravel(),
+                                 minlength=size * n_groups).reshape(size, n_groups)
+            result[first:first + size, :, region] = totals / totals.sum(axis=1, keepdims=True)
+    return result
+
+
+def _permutation_replicates(combined, n_first, n_replicates, seed):
+    # Difference in means after shuffling the pooled sample.
+    rng = np.random.default_rng(seed)
+    result = np.empty(n_replicates)
+    block = replicate_block(8 * len(combined))
+    for first in range(0, n_replicates, block):
+        size = min(block, n_replicates - first)
+        shuffled = rng.permuted(np.broadcast_to(combined, (size, len(combined))), axis=1)
+        result[first:first + size] = (shuffled[:, :n_first].mean(axis=1)
+                                      - shuffled[:, n_first:].mean(axis=1))
+    return result
+
+
+def _interval(replicates, ci):
+    tail = (1 - ci) / 2 * 100
+    with warnings.catch_warnings():
+        # Categories without data have all-NaN replicates and stay NaN.
+        warnings.simplefilter('ignore', RuntimeWarning)
+        return np.nanpercentile(replicates, [tail, 100 - tail], axis=0)
+
+
+def bootstrap_groups(games, dimension, value, statistic='mean', n_replicates=10_000,
+                     ci=0.95, seed=None, workers=None):
+    """Percentile bootstrap intervals of a statistic of ``value`` per category.
+
+    ``statistic`` is 'mean' or 'median'; missing values are skipped. Each
+    category is resampled within itself, e.g. mean user score per platform or
+    median total sales per genre. Returns one row per category with the
+    estimate, the interval bounds and the bootstrap standard error.
+    """
+    if statistic not in STATISTICS:
+        raise ValueError(f'unknown statistic {statistic!r}, expected one of {list(STATISTICS)}')
+    codes, labels = category_codes(games[dimension])
+    column = MaskedColumn.from_series(games[value])
+    keep = column.valid & (codes >= 0)
+    order = np.argsort(codes[keep], kind='stable')
+    counts = np.bincount(codes[keep], minlength=len(labels))
+    groups = np.split(column.values[keep][order], np.cumsum(counts)[:-1])
+
+    replicates = _run_sharded(_group_replicates, (groups, statistic), n_replicates, seed, workers)
+    estimate = np.array([STATISTICS[statistic](values[None, :])[0] if len(values) else np.nan
+                         for values in groups])
+    lower, upper = _interval(replicates, ci)
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore', RuntimeWarning)
+        std_error = np.nanstd(replicates, axis=0, ddof=1)
+    return pd.DataFrame({'count': counts, 'estimate': estimate, 'lower': lower,
+                         'upper': upper, 'std_error': std_error},
+                        index=pd.Index(labels, name=dimension))
+
+
+def bootstrap_shares(games, dimension='platform', regions=SALES_COLUMNS, n_replicates=10_000,
+                     ci=0.95, seed=None, workers=None):
+    """Bootstrap intervals of each category's share of every region's sales.
+
+    Games are resampled with replacement and the shares of all categories in
+    all regions are recomputed per replicate. Returns a frame indexed by
+    (region, category) with the observed share and its interval.
+    """
+    codes, labels = category_codes(games[dimension])
+    keep = codes >= 0
+    sales = np.column_stack([games[region].to_numpy(dtype=np.float64, na_value=0.0)[keep]
+                             for region in regions])
+    replicates = _run_sharded(_share_replicates, (codes[keep], len(labels), sales),
+                              n_replicates, seed, workers)
+
+    totals = np.stack([np.bincount(codes[keep], weights=sales[:, region], minlength=len(labels))
+                       for region in range(len(regions))], axis=1)
+    observed = totals / totals.sum(axis=0)
+    lower, upper = _interval(replicates, ci)
+    index = pd.MultiIndex.from_product([regions, labels], names=['region', dimension])
+    return pd.DataFrame({'share': observed.T.ravel(), 'lower': lower.T.ravel(),
+                         'upper': upper.T.ravel()}, index=index)
+
+
+def permutation_test(first, second, n_permutations=10_000, seed=None, workers=None):
+    """Two-sided permutation test for a difference in means.
+
+    ``first`` and ``second`` are array-likes; missing values are dropped.
+    Returns ``(observed_difference, pvalue)``.
+    """
+    first = pd.Series(first, dtype='Float64').dropna().to_numpy(dtype=np.float64)
+    second = pd.Series(second, dtype='Float64').dropna().to_numpy(dtype=np.float64)
+    observed = first.mean() - second.mean()
+    combined = np.concatenate((first, second))
+    replicates = _run_sharded(_permutation_replicates, (combined, len(first)),
+                              n_permutations, seed, workers)
+    exceed = (np.abs(replicates) >= abs(observed) - 1e-12).sum()
+    return observed, (exceed + 1) / (n_permutations + 1)
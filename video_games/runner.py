@@ -0,0 +1,221 @@
+"""Run the report's analysis sections as a dependency graph over a process pool.
+
+The notebook is one linear sequence, although after the cell 32 filter
+most sections (platform lifecycles, review correlations, multiplatform
+genres, regional profiles, hypothesis tests) only read ``relevant_games``.
+``run_report`` cleans and filters the games once and publishes the frame
+as a ``SharedGames`` block; every worker attaches read-only views in its
+initializer, so the frame is neither pickled nor copied per process.
+``transport='snapshot'`` writes an uncompressed Feather file for the
+workers to memory-map instead. Sections whose dependencies are finished
+are submitted as soon as a worker is free; a section receives its
+dependencies' results as keyword arguments. With a ``ResultCache`` the
+results are kept across runs, so only sections whose input or code
+version changed run again.
+"""
+
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from pathlib import Path
+
+from video_games import loader
+from video_games.correlation import grouped_correlations
+from video_games.distributions import box_table
+from video_games.forecasting import forecast_sales
+from video_games.hypothesis import pairwise_tests
+from video_games.lifecycle import platform_lifecycles
+from video_games.regions import region_report
+from video_games.shared import SharedGames, attach
+from video_games.streaming import RELEVANT_YEARS
+from video_games.titles import multiplatform_games
+from video_games.trends import category_trends
+
+_GAMES = None
+
+
+class Section:
+    """One named analysis step: ``function(games, **dependency_results)``.
+
+    ``function`` must be importable at module level so it can be sent to a
+    worker process.
+    """
+
+    def __init__(self, name, function, depends=()):
+        self.name = name
+        self.function = function
+        self.depends = tuple(depends)
+
+
+def _lifecycles(games):
+    return platform_lifecycles(games)
+
+
+def _trends(games):
+    return category_trends(games, 'platform')
+
+
+def _correlations(games):
+    return grouped_correlations(games, by='platform')
+
+
+def _multiplatform(games):
+    return multiplatform_games(games)
+
+
+def _multiplatform_genres(games, multiplatform):
+    return box_table(multiplatform, 'genre', 'total_sales', include_fliers=False)
+
+
+def _regions(games):
+    return region_report(games, years=None).profiles()
+
+
+def _platform_tests(games):
+    return pairwise_tests(games, 'platform', 'user_score', tests=('welch',))
+
+
+def _genre_tests(games):
+    return pairwise_tests(games, 'genre', 'user_score', tests=('welch',))
+
+
+def _forecasts(games):
+    return forecast_sales(games)
+
+
+DEFAULT_SECTIONS = (
+    Section('lifecycles', _lifecycles),
+    Section('trends', _trends),
+    Section('correlations', _correlations),
+    Section('multiplatform', _multiplatform),
+    Section('multiplatform_genres', _multiplatform_genres, depends=['multiplatform']),
+    Section('regions', _regions),
+    Section('platform_tests', _platform_tests),
+    Section('genre_tests', _genre_tests),
+    Section('forecasts', _forecasts),
+)
+
+
+def _check_graph(sections):
+    names = {section.name for section in sections}
+    for section in sections:
+        missing = set(section.depends) - names
+        if missing:
+            raise ValueError(f'section {section.name!r} depends on unknown {sorted(missing)}')
+    done, pending = set(), list(sections)
+    while pending:
+        ready = [section for section in pending if set(section.depends) <= done]
+        if not ready:
+            raise ValueError(f'dependency cycle among {[section.name for section in pending]}')
+        done.update(section.name for section in ready)
+        pending = [section for section in pending if section not in ready]
+
+
+def _init_worker(transport, payload):
+    # Each worker maps the frame once; without pyarrow the frame is pickled in.
+    global _GAMES
+    if transport == 'shared':
+        _GAMES = attach(payload)
+    elif transport == 'snapshot':
+        _GAMES = loader.read_snapshot(payload)
+    else:
+        _GAMES = payload
+
+
+def _run_section(function, dependencies):
+    return function(_GAMES, **dependencies)
+
+
+def _section_key(cache, digest, section, years):
+    function = f'{section.function.__module__}.{section.function.__qualname__}'
+    params = {'years': list(years), 'function': function, 'depends': list(section.depends)}
+    return cache.key(f'report/{section.name}', digest, params)
+
+
+def _relevant(games, years):
+    released = games['year_of_release']
+    inside = (released >= years[0]) & (released <= years[1])
+    return games[inside.to_numpy(dtype=bool, na_value=False)].reset_index(drop=True)
+
+
+def run_report(path=loader.DATA_PATH, sections=DEFAULT_SECTIONS, years=RELEVANT_YEARS,
+               workers=None, cache_dir=loader.CACHE_DIR, transport='shared', cache=None):
+    """Run ``sections`` on the games released in ``years`` and return ``{name: result}``.
+
+    ``workers`` defaults to the number of CPUs; with 1 the sections run in
+    dependency order in this process. ``transport`` is 'shared' (a
+    ``SharedGames`` block the workers view without copying) or 'snapshot' (a
+    memory-mapped Feather file, converted to a private frame in each worker).
+    ``cache`` is an optional ``ResultCache``; sections found there for the
+    current input file are not run, and the games are not even loaded when
+    every section is cached.
+    """
+    if transport not in ('snapshot', 'shared'):
+        raise ValueError(f"unknown transport {transport!r}, expected 'snapshot' or 'shared'")
+    _check_graph(sections)
+    results = {}
+    keys = {}
+    if cache is not None:
+        digest = cache.input_digest(path)
+        for section in sections:
+            keys[section.name] = _section_key(cache, digest, section, years)
+            value = cache.get(keys[section.name])
+            if value is not None:
+                results[section.name] = value
+    cached = set(results)
+    pending = [section for section in sections if section.name not in cached]
+    if pending:
+        _run_pending(pending, results, _relevant(loader.load_games(path, cache_dir), years),
+                     path, years, workers, cache_dir, transport)
+    if cache is not None:
+        for section in pending:
+            cache.put(keys[section.name], results[section.name])
+    return {section.name: results[section.name] for section in sections}
+
+
+def _run_pending(pending, results, games, path, years, workers, cache_dir, transport):
+    # Run the sections in ``pending`` and add their results to ``results``.
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        global _GAMES
+        _GAMES = games
+        pending = list(pending)
+        while pending:
+            section = next(section for section in pending if set(section.depends) <= set(results))
+            results[section.name] = _run_section(
+                section.function, {name: results[name] for name in section.depends})
+            pending.remove(section)
+        _GAMES = None
+        return
+
+    shared = None
+    if transport == 'shared':
+        shared = SharedGames.publish(games)
+        initargs = ('shared', shared.layout)
+    elif loader.feather is not None:
+        digest = loader.file_digest(path)[:16]
+        snapshot = (Path(cache_dir) / f'relevant-{digest}-{years[0]}-{years[1]}'
+                    f'-v{loader.SNAPSHOT_VERSION}.feather')
+        if not snapshot.exists():
+            loader.write_snapshot(games, snapshot)
+        initargs = ('snapshot', snapshot)
+    else:
+        initargs = ('frame', games)
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=initargs) as pool:
+            running = {}
+            pending = list(pending)
+            while pending or running:
+                ready = [section for section in pending if set(section.depends) <= set(results)]
+                for section in ready:
+                    dependencies = {name: results[name] for name in section.depends}
+                    future = pool.submit(_run_section, section.function, dependencies)
+                    running[future] = section.name
+                    pending.remove(section)
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    results[running.pop(future)] = future.result()
+    finally:
+        if shared is not None:
+            shared.close()
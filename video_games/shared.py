@@ -0,0 +1,152 @@
+"""Publish the cleaned games frame once in shared memory for worker processes.
+
+Parallel steps (the resampling shards, the report runner's sections)
+otherwise pickle the games frame, or a filtered copy, into every worker,
+which can cost more than the work itself. ``SharedGames.publish`` lays the
+columns out in one ``multiprocessing.shared_memory`` block: numeric columns
+as contiguous arrays, nullable columns as values plus a missing mask,
+categoricals as their dictionary codes and text as UTF-8 bytes with
+offsets. Only the small, picklable ``layout`` is sent to workers, and
+``attach`` rebuilds a frame whose numeric, nullable and categorical columns
+are read-only views of the shared block. Text columns are decoded on
+attach, so leave them out when a worker does not need them.
+"""
+
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+ALIGNMENT = 64
+
+# Blocks attached in this process, kept alive while their views are in use.
+_ATTACHED = {}
+
+
+def _aligned(offset):
+    return -(-offset // ALIGNMENT) * ALIGNMENT
+
+
+def _column_buffers(series):
+    # Return (kind, extra, {part: array}) for one column.
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        return 'category', list(dtype.categories), {'codes': series.cat.codes.to_numpy()}
+    if isinstance(dtype, pd.api.extensions.ExtensionDtype) and dtype.kind in 'iuf':
+        mask = series.isna().to_numpy()
+        values = series.to_numpy(dtype=dtype.numpy_dtype, na_value=0)
+        return 'masked', str(dtype), {'values': values, 'mask': mask}
+    if dtype.kind in 'iufb':
+        return 'numeric', None, {'values': series.to_numpy()}
+    missing = series.isna().to_numpy()
+    encoded = [b'' if gone else str(value).encode() for value, gone in zip(series, missing)]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(value) for value in encoded])
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    return 'text', None, {'data': data, 'offsets': offsets, 'mask': missing}
+
+
+def _view(block, part):
+    offset, dtype, length = part
+    array = np.ndarray((length,), dtype=dtype, buffer=block.buf, offset=offset)
+    array.flags.writeable = False
+    return array
+
+
+def _rebuild(block, kind, extra, parts):
+    if kind == 'numeric':
+        return _view(block, parts['values'])
+    if kind == 'masked':
+        values, mask = _view(block, parts['values']), _view(block, parts['mask'])
+        array_type = pd.arrays.FloatingArray if np.dtype(values.dtype).kind == 'f' \
+            else pd.arrays.IntegerArray
+        return array_type(values, mask)
+    if kind == 'category':
+        codes, dtype = _view(block, parts['codes']), pd.CategoricalDtype(extra)
+        try:
+            # Codes are valid by construction; validating would copy them.
+            return pd.Categorical.from_codes(codes, dtype=dtype, validate=False)
+        except TypeError:  # pandas < 2.1
+            return pd.Categorical.from_codes(codes, dtype=dtype)
+    data = _view(block, parts['data']).tobytes()
+    offsets = _view(block, parts['offsets'])
+    mask = _view(block, parts['mask'])
+    values = [None if gone else data[start:stop].decode()
+              for start, stop, gone in zip(offsets[:-1], offsets[1:], mask)]
+    return pd.array(values, dtype='str')
+
+
+class SharedGames:
+    """Owner of a shared-memory copy of a games frame.
+
+    ``layout`` describes where every column lives and is all a worker needs
+    to ``attach``. The owner must ``close`` (or use ``with``) to free the
+    block once workers are done.
+    """
+
+    def __init__(self, block, layout):
+        self.block = block
+        self.layout = layout
+
+    @classmethod
+    def publish(cls, games):
+        """Copy ``games`` into a new shared-memory block."""
+        columns = []
+        arrays = []
+        offset = 0
+        for name in games.columns:
+            kind, extra, buffers = _column_buffers(games[name])
+            parts = {}
+            for part, array in buffers.items():
+                array = np.ascontiguousarray(array)
+                offset = _aligned(offset)
+                parts[part] = (offset, array.dtype.str, len(array))
+                arrays.append((offset, array))
+                offset += array.nbytes
+            columns.append((name, kind, extra, parts))
+        block = shared_memory.SharedMemory(create=True, size=max(offset, 1))
+        for start, array in arrays:
+            target = np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf, offset=start)
+            target[:] = array
+        layout = {'name': block.name, 'rows': len(games), 'columns': columns}
+        return cls(block, layout)
+
+    def frame(self, columns=None):
+        """Return the published frame as views, in the owning process."""
+        return attach(self.layout, columns)
+
+    def close(self):
+        """Release and unlink the block; views become invalid afterwards."""
+        _ATTACHED.pop(self.block.name, None)
+        self.block.close()
+        self.block.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def attach(layout, columns=None):
+    """Return a read-only frame over the shared block described by ``layout``.
+
+    ``columns`` restricts the result (and the text decoding) to the listed
+    columns. The block stays mapped in this process until ``detach``.
+    """
+    block = _ATTACHED.get(layout['name'])
+    if block is None:
+        block = shared_memory.SharedMemory(name=layout['name'])
+        _ATTACHED[layout['name']] = block
+    wanted = None if columns is None else set(columns)
+    data = {name: _rebuild(block, kind, extra, parts)
+            for name, kind, extra, parts in layout['columns']
+            if wanted is None or name in wanted}
+    return pd.DataFrame(data, index=pd.RangeIndex(layout['rows']), copy=False)
+
+
+def detach(layout):
+    """Unmap a block attached with ``attach``; frames built from it become invalid."""
+    block = _ATTACHED.pop(layout['name'], None)
+    if block is not None:
+        block.close()
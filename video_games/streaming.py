@@ -0,0 +1,72 @@
+"""Chunked pipeline for sales files that do not fit in memory.
+
+The notebook keeps the whole games frame in memory and copies it repeatedly
+(``relevant_games``, the regional frames, the multiplatform copy). Here the
+CSV is read in chunks and each chunk flows through a chain of generators:
+clean, derive ``total_sales``, keep the relevant release window and reduce to
+a partial ``SalesCube``. Partial cubes are merged at the end, so memory use is
+bounded by the chunk size and the number of cube cells, not the file size.
+
+Missing release years are repaired only from rows inside the same chunk; rows
+of a game spread across chunks keep their missing year. All chunks share one
+set of category dictionaries, so a label gets the same code in every chunk.
+"""
+
+from video_games.cube import SalesCube
+from video_games.encoding import load_dictionaries
+from video_games.loader import DATA_PATH, clean_games, read_games_csv
+
+RELEVANT_YEARS = (1996, 2016)
+
+
+def read_chunks(path=DATA_PATH, chunksize=100_000):
+    """Yield typed, renamed chunks of the raw CSV."""
+    yield from read_games_csv(path, chunksize=chunksize)
+
+
+def clean_chunks(chunks, dictionaries=None):
+    """Apply the loader's cleaning rules, including ``total_sales``, per chunk.
+
+    ``dictionaries`` (the shipped seed by default) collects the labels of
+    every chunk in memory; saving them is up to the caller.
+    """
+    if dictionaries is None:
+        dictionaries = load_dictionaries()
+    for chunk in chunks:
+        yield clean_games(chunk, dictionaries)
+
+
+def filter_years(chunks, years=RELEVANT_YEARS):
+    """Keep rows released within ``years`` (inclusive), as notebook cell 32."""
+    start, end = years
+    for chunk in chunks:
+        year = chunk['year_of_release']
+        yield chunk[(year >= start) & (year <= end)].reset_index(drop=True)
+
+
+def partial_cubes(chunks):
+    """Reduce every chunk to a ``SalesCube`` of its own rows."""
+    for chunk in chunks:
+        if len(chunk):
+            yield SalesCube.from_frame(chunk)
+
+
+def merge_cubes(cubes):
+    """Merge partial cubes into one; returns ``None`` for an empty stream."""
+    merged = None
+    for cube in cubes:
+        merged = cube if merged is None else merged.merge(cube)
+    return merged
+
+
+def stream_cube(path=DATA_PATH, chunksize=100_000, years=RELEVANT_YEARS, dictionaries=None):
+    """Build the relevant-window ``SalesCube`` of a CSV without loading it whole.
+
+    Pass ``years=None`` to keep every release year. The platform, genre,
+    rating and region tables then come from ``cube.by_region(dimension)`` and
+    ``cube.rollup(...)`` exactly as for a cube built from the full frame.
+    """
+    chunks = clean_chunks(read_chunks(path, chunksize), dictionaries)
+    if years is not None:
+        chunks = filter_years(chunks, years)
+    return merge_cubes(partial_cubes(chunks))
@@ -0,0 +1,205 @@
+"""Cross-platform game identity from fuzzy title matching.
+
+The multiplatform section of the notebook (cells 41-43) groups on the exact
+``name`` string, so punctuation, casing or a regional suffix split one game
+into several. Titles here are normalised, shingled into character trigrams
+and summarised by MinHash signatures. Locality-sensitive hashing over bands
+of the signatures proposes candidate matches without comparing every pair of
+titles, and matches are joined into connected groups that share a game id.
+"""
+
+from difflib import SequenceMatcher
+
+import numpy as np
+import pandas as pd
+
+from video_games.dedup import normalize_titles
+
+SHINGLE_SIZE = 3
+NUM_PERMUTATIONS = 64
+NUM_BANDS = 16
+MATCH_THRESHOLD = 0.85
+
+# Words carrying a sequel or edition number: '2', '3d', '2001', 'ii', 'iv'.
+SEQUEL_TOKENS = r'\b(?:\w*\d\w*|[ivx]{1,4})\b'
+
+# The dataset's sales-region notes, e.g. '(JP sales)', '(weekly JP sales)'.
+SALES_SUFFIX = r'\s*\([^\)]*\bsales\b[^\)]*\)'
+# Any other bracketed label, e.g. '(2016)', '(Remake)', '[Prototype 2]'.
+BRACKET_LABEL = r'[\(\[]([^\)\]]*)[\)\]]'
+
+# Words ignored when comparing the wording of two matched titles.
+FILLER_WORDS = frozenset({'the'})
+# A possessive "'s", joined onto its word so it does not become a lone 's'.
+POSSESSIVE = r"(\w)['\u2019]s\b"
+
+# How alike the words only one title has must be to count as a spelling variant.
+SPELLING_RATIO = 0.8
+
+_LOW_32_BITS = np.uint64((1 << 32) - 1)
+
+
+def _strip_sales_suffix(names):
+    return names.astype('object').str.replace(SALES_SUFFIX, '', regex=True, case=False)
+
+
+def canonical_title(names):
+    """Normalise titles for matching: drop sales-region notes, '&' and punctuation.
+
+    Other bracketed labels such as a reboot's year or '(Remake)' stay part of
+    the title. Possessives lose their apostrophe ("Christie's" becomes
+    'christies'), so a lone 's' is left for edition letters such as the one
+    in 'Super Robot Taisen S'.
+    """
+    names = _strip_sales_suffix(names).str.replace('&', ' and ', regex=False)
+    names = names.str.replace(POSSESSIVE, r'\1s', regex=True)
+    return normalize_titles(names)
+
+
+def edition_keys(names):
+    """Return the numbered words and bracketed labels that must agree for a match.
+
+    Taken from the raw names (minus sales-region notes), so 'Doom' and
+    'Doom (2016)' or 'Resident Evil' and 'Resident Evil (Remake)' differ.
+    """
+    names = _strip_sales_suffix(names)
+    numbers = normalize_titles(names).str.findall(SEQUEL_TOKENS).str.join(' ')
+    labels = names.str.findall(BRACKET_LABEL).map(
+        lambda found: ' '.join(sorted(label.strip().lower() for label in found)),
+        na_action='ignore')
+    return numbers + '|' + labels
+
+
+def same_wording(left, right):
+    """Whether two canonical titles differ only in spelling, not by a word.
+
+    'brave story new traveler' and 'brave story new traveller' or 'beat down'
+    and 'beatdown' agree, while an added or swapped word ('hd', 'plus',
+    'wii u', 'r' for 'a') names another edition of the game.
+    """
+    left_words, right_words = left.split(), right.split()
+    only_left = [word for word in left_words
+                 if word not in right_words and word not in FILLER_WORDS]
+    only_right = [word for word in right_words
+                  if word not in left_words and word not in FILLER_WORDS]
+    if not only_left or not only_right:
+        return not only_left and not only_right
+    return SequenceMatcher(None, ''.join(only_left), ''.join(only_right)).ratio() >= SPELLING_RATIO
+
+
+def _shingles(titles):
+    # Flat (title position, shingle hash) arrays for all titles at once.
+    owners = []
+    grams = []
+    for position, title in enumerate(titles):
+        padded = f' {title} '
+        count = max(len(padded) - SHINGLE_SIZE + 1, 1)
+        grams.extend(padded[start:start + SHINGLE_SIZE] for start in range(count))
+        owners.append(np.full(count, position, dtype=np.int64))
+    owners = np.concatenate(owners) if owners else np.empty(0, dtype=np.int64)
+    hashes = pd.util.hash_array(np.array(grams, dtype=object))
+    return owners, hashes
+
+
+def minhash_signatures(titles, num_permutations=NUM_PERMUTATIONS, seed=0):
+    """Return a ``(len(titles), num_permutations)`` array of MinHash values."""
+    owners, hashes = _shingles(titles)
+    rng = np.random.default_rng(seed)
+    multipliers = rng.integers(1, 1 << 63, size=num_permutations, dtype=np.uint64) | np.uint64(1)
+    offsets = rng.integers(0, 1 << 63, size=num_permutations, dtype=np.uint64)
+
+    # Shingles of a title are contiguous, so reduceat takes each title's minimum.
+    starts = np.flatnonzero(np.r_[True, owners[1:] != owners[:-1]])
+    signatures = np.empty((len(titles), num_permutations), dtype=np.uint32)
+    block = 8
+    for first in range(0, num_permutations, block):
+        permuted = hashes[:, None] * multipliers[first:first + block] + offsets[first:first + block]
+        permuted = (permuted >> np.uint64(32)) & _LOW_32_BITS
+        signatures[:, first:first + block] = np.minimum.reduceat(permuted, starts, axis=0)
+    return signatures
+
+
+def _band_edges(signatures, bands):
+    # Link every title to the first title of each LSH bucket it falls in.
+    rows = signatures.shape[1] // bands
+    edges = []
+    for band in range(bands):
+        chunk = pd.DataFrame(signatures[:, band * rows:(band + 1) * rows])
+        bucket = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        leaders = pd.Series(np.arange(len(bucket))).groupby(bucket).transform('first').to_numpy()
+        linked = leaders != np.arange(len(bucket))
+        edges.append(np.column_stack((np.flatnonzero(linked), leaders[linked])))
+    if not edges:
+        return np.empty((0, 2), dtype=np.int64)
+    return np.unique(np.concatenate(edges), axis=0)
+
+
+def _connected_labels(count, edges):
+    # Min-label propagation over the edge list until no label changes.
+    labels = np.arange(count)
+    if len(edges) == 0:
+        return labels
+    left, right = edges[:, 0], edges[:, 1]
+    while True:
+        smaller = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, smaller)
+        np.minimum.at(updated, right, smaller)
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def resolve_titles(names, threshold=MATCH_THRESHOLD, num_permutations=NUM_PERMUTATIONS,
+                   bands=NUM_BANDS):
+    """Assign a game id to every name so variants of one title share an id.
+
+    Two titles match when their estimated trigram Jaccard similarity is at
+    least ``threshold``, they have the same ``edition_keys`` and
+    ``same_wording`` holds, which keeps
+    sequels, yearly editions and reboots such as 'FIFA 14' and 'FIFA 15',
+    'Parasite Eve' and 'Parasite Eve II' or 'Doom' and 'Doom (2016)' apart.
+    Returns an integer Series aligned with ``names``; missing names get -1.
+    """
+    titles = canonical_title(names)
+    present = titles.notna() & (titles != '')
+    # A title is its canonical text plus its edition key, so reboots that
+    # normalise to the same text still get their own id.
+    keys = pd.DataFrame({'title': titles, 'edition': edition_keys(names)})[present]
+    groups = keys.groupby(['title', 'edition'], sort=True)
+    title_codes = groups.ngroup().to_numpy()
+    unique_keys = groups.size().index
+    unique_titles = pd.Series(unique_keys.get_level_values('title').to_numpy(dtype=object))
+    unique_editions = unique_keys.get_level_values('edition').to_numpy(dtype=object)
+
+    signatures = minhash_signatures(unique_titles, num_permutations)
+    edges = _band_edges(signatures, bands)
+    if len(edges):
+        similarity = (signatures[edges[:, 0]] == signatures[edges[:, 1]]).mean(axis=1)
+        same_edition = unique_editions[edges[:, 0]] == unique_editions[edges[:, 1]]
+        edges = edges[(similarity >= threshold) & same_edition]
+        wording = [same_wording(unique_titles[left], unique_titles[right]) for left, right in edges]
+        edges = edges[np.array(wording, dtype=bool)]
+    labels = _connected_labels(len(unique_titles), edges)
+    _, game_ids = np.unique(labels, return_inverse=True)
+
+    result = np.full(len(names), -1, dtype=np.int64)
+    result[present.to_numpy()] = game_ids[title_codes]
+    return pd.Series(result, index=names.index, name='game_id')
+
+
+def multiplatform_games(games, game_ids=None):
+    """Return the rows of games released on more than one platform.
+
+    Games are identified by ``resolve_titles`` unless ``game_ids`` is given,
+    so title variants count as the same game; the result carries a
+    ``game_id`` column.
+    """
+    if game_ids is None:
+        game_ids = resolve_titles(games['name'])
+    games = games.assign(game_id=game_ids)
+    known = games['game_id'] >= 0
+    platforms = games[known].groupby('game_id')['platform'].nunique()
+    multiplatform = platforms.index[platforms > 1]
+    return games[games['game_id'].isin(multiplatform)]
@@ -0,0 +1,108 @@
+"""Growing and shrinking platforms and genres from one year x category matrix.
+
+Cell 30 of the notebook answers "which platforms are growing or shrinking"
+by overlaying ten line plots, each built from its own
+``df[df['platform'] == platform].groupby('year_of_release')`` filter. Here
+the yearly sales of every category and region come out of a
+``WindowIndex`` as one (years, categories, regions) array, and year-over-year
+growth, CAGR and the least-squares slope with its t-test are evaluated for
+all of them together along the year axis.
+"""
+
+import numpy as np
+import pandas as pd
+from scipy import stats
+
+from video_games.cube import SalesCube
+from video_games.windows import WindowIndex
+
+TREND_WINDOW = 5
+STATUSES = ('growing', 'shrinking', 'stable', 'dead')
+
+
+def _window_index(source, dimension):
+    if isinstance(source, WindowIndex):
+        return source
+    cube = source if isinstance(source, SalesCube) else SalesCube.from_frame(source)
+    return WindowIndex.from_cube(cube, dimension)
+
+
+def yearly_sales(index):
+    """Return the ``(years, categories, regions)`` sales array of a ``WindowIndex``."""
+    regions = [position for position, region in enumerate(index.regions) if region != 'count']
+    return np.diff(index.cumulative, axis=0)[:, :, regions]
+
+
+def yoy_growth(source, dimension='platform', region='total_sales'):
+    """Return years x categories year-over-year growth; NaN after a year without sales."""
+    index = _window_index(source, dimension)
+    sales = np.diff(index.cumulative[:, :, index.regions.index(region)], axis=0)
+    growth = np.full_like(sales, np.nan)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        growth[1:] = sales[1:] / np.where(sales[:-1] > 0, sales[:-1], np.nan) - 1
+    return pd.DataFrame(growth, index=pd.Index(index.years, name='year_of_release'),
+                        columns=index.categories)
+
+
+def category_trends(source, dimension='platform', window=TREND_WINDOW, last_year=None,
+                    alpha=0.05):
+    """Rank every category's recent trend in every region.
+
+    ``source`` is a games frame, a ``SalesCube`` (e.g. ``GameStore.cube``)
+    or a ``WindowIndex``. Over the ``window`` years ending at ``last_year``
+    (the latest year by default) each category gets its last year's sales,
+    year-over-year growth, CAGR from the window's first year, the slope of
+    sales per year with its two-sided p-value, a status and its rank by
+    slope within the region. A category is 'dead' when it sold in the
+    window but not in its last year; 'growing' and 'shrinking' need a
+    slope significant at ``alpha``. Returns a frame indexed by
+    ``(region, category)`` for categories that sold at some point. The
+    slope's t-test needs a ``window`` of at least three years.
+    """
+    if window < 3:
+        raise ValueError(f'window must cover at least three years, got {window}')
+    index = _window_index(source, dimension)
+    last_year = index.years[-1] if last_year is None else last_year
+    stop = int(np.searchsorted(index.years, last_year, side='right'))
+    start = max(stop - window, 0)
+    sales = yearly_sales(index)[start:stop]
+    regions = [region for region in index.regions if region != 'count']
+    n = len(sales)
+    if n < 3:
+        raise ValueError(f'only {n} years of data end at {last_year}, a trend needs three')
+
+    years = index.years[start:stop].astype(np.float64)
+    centred = years - years.mean()
+    sxx = (centred ** 2).sum()
+    means = sales.mean(axis=0)
+    slopes = np.tensordot(centred, sales - means, axes=1) / sxx
+    residual = sales - means - centred[:, None, None] * slopes
+    with np.errstate(invalid='ignore', divide='ignore'):
+        error = np.sqrt((residual ** 2).sum(axis=0) / (n - 2) / sxx)
+        t_values = slopes / error
+        p_values = 2 * stats.t.sf(np.abs(t_values), n - 2)
+        p_values = np.where(error == 0, np.where(slopes == 0, 1.0, 0.0), p_values)
+        first, previous, last = sales[0], sales[-2], sales[-1]
+        yoy = last / np.where(previous > 0, previous, np.nan) - 1
+        cagr = (last / np.where(first > 0, first, np.nan)) ** (1 / (n - 1)) - 1
+
+    sold = sales.sum(axis=0) > 0
+    status = np.full(slopes.shape, 'stable', dtype=object)
+    significant = p_values < alpha
+    status[significant & (slopes > 0)] = 'growing'
+    status[significant & (slopes < 0)] = 'shrinking'
+    status[sold & (last == 0)] = 'dead'
+
+    result = pd.DataFrame({
+        'last_sales': last.T.ravel(),
+        'yoy': yoy.T.ravel(),
+        'cagr': cagr.T.ravel(),
+        'slope': slopes.T.ravel(),
+        'pvalue': p_values.T.ravel(),
+        'status': status.T.ravel(),
+    }, index=pd.MultiIndex.from_product([regions, index.categories],
+                                        names=['region', dimension]))
+    result = result[sold.T.ravel()]
+    result['rank'] = result.groupby(level='region')['slope'].rank(
+        ascending=False, method='min').astype(np.int64)
+    return result
@@ -0,0 +1,123 @@
+"""Any-length year windows answered from cumulative sums.
+
+Cell 32 of the notebook hard-codes the relevant period as
+``year_of_release > 1995 & <= 2016`` and every later step works on that
+filtered copy, so trying another period means re-running everything.
+``WindowIndex`` keeps, for one dimension, the running totals of sales and
+game counts over a contiguous year axis. The sum over any inclusive window
+``first..last`` is then ``cumulative[last + 1] - cumulative[first]``, one
+subtraction per window, and rolling or swept windows are a single array
+difference over all window ends at once.
+"""
+
+import numpy as np
+import pandas as pd
+
+from video_games.cube import SalesCube
+
+
+class WindowIndex:
+    """Prefix sums of yearly sales per category and region.
+
+    ``cumulative[i]`` holds the totals of all years before ``years[i]``, so it
+    has one more row than ``years``; the region axis ends with
+    ``'total_sales'`` and ``'count'``.
+    """
+
+    def __init__(self, years, categories, regions, cumulative):
+        self.years = years
+        self.categories = categories
+        self.regions = list(regions)
+        self.cumulative = cumulative
+
+    @classmethod
+    def from_cube(cls, cube, dimension='platform'):
+        """Build the index for ``dimension`` from a ``SalesCube``."""
+        cube = cube.slice(year_of_release=slice(None, None))
+        known = cube.labels['year_of_release'].astype(np.int64)
+        years = np.arange(known.min(), known.max() + 1)
+        regions = cube.regions + ['total_sales', 'count']
+        yearly = np.zeros((len(years), len(cube.labels[dimension]), len(regions)))
+        for position, region in enumerate(regions):
+            table = cube.pivot('year_of_release', dimension, region).reindex(
+                index=cube.labels['year_of_release'], columns=cube.labels[dimension])
+            yearly[known - years[0], :, position] = table.to_numpy(dtype=np.float64)
+        cumulative = np.concatenate([np.zeros((1,) + yearly.shape[1:]), yearly.cumsum(axis=0)])
+        return cls(years, pd.Index(cube.labels[dimension], name=dimension), regions, cumulative)
+
+    @classmethod
+    def from_frame(cls, games, dimension='platform'):
+        """Build the index for ``dimension`` from a cleaned games frame."""
+        return cls.from_cube(SalesCube.from_frame(games), dimension)
+
+    def _bounds(self, first, last):
+        # Clip an inclusive year window to the axis; returns prefix positions.
+        start = int(np.clip(first - self.years[0], 0, len(self.years)))
+        stop = int(np.clip(last - self.years[0] + 1, start, len(self.years)))
+        return start, stop
+
+    def _region(self, region):
+        return self.regions.index(region)
+
+    def totals(self, first, last):
+        """Return a categories x regions frame of sales and counts in ``first..last``."""
+        start, stop = self._bounds(first, last)
+        return pd.DataFrame(self.cumulative[stop] - self.cumulative[start],
+                            index=self.categories, columns=self.regions)
+
+    def shares(self, first, last, region='total_sales'):
+        """Return each category's share of ``region`` sales in ``first..last``."""
+        sums = self.totals(first, last)[region]
+        return sums / sums.sum()
+
+    def growth(self, first, last, region='total_sales'):
+        """Return the change in window sales against the preceding equal-length window.
+
+        For 2012-2016 this compares with 2007-2011; NaN where the earlier
+        window has no sales, and everywhere when either window reaches past
+        ``years``, since a clipped window would cover fewer years.
+        """
+        length = last - first + 1
+        current = self.totals(first, last)[region]
+        previous = self.totals(first - length, first - 1)[region]
+        if first - length < self.years[0] or last > self.years[-1]:
+            return pd.Series(np.nan, index=current.index, name=current.name)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return current / previous.where(previous > 0) - 1
+
+    def rolling(self, length, region='total_sales'):
+        """Return window-end years x categories sums of every ``length``-year window."""
+        prefix = self.cumulative[:, :, self._region(region)]
+        sums = prefix[length:] - prefix[:-length]
+        return pd.DataFrame(sums, index=pd.Index(self.years[length - 1:], name='last_year'),
+                            columns=self.categories)
+
+    def expanding(self, region='total_sales'):
+        """Return years x categories running totals since the first year."""
+        return pd.DataFrame(self.cumulative[1:, :, self._region(region)],
+                            index=pd.Index(self.years, name='last_year'), columns=self.categories)
+
+    def sweep(self, lengths=range(3, 11), region='total_sales', statistic='sum'):
+        """Evaluate every window of each length in ``lengths`` in one pass.
+
+        ``statistic`` is 'sum', 'share' or 'growth' (against the preceding
+        window of the same length). Returns a frame indexed by
+        ``(length, last_year)`` with one column per category.
+        """
+        if statistic not in ('sum', 'share', 'growth'):
+            raise ValueError(f"unknown statistic {statistic!r}, "
+                             "expected 'sum', 'share' or 'growth'")
+        prefix = self.cumulative[:, :, self._region(region)]
+        frames = {}
+        for length in lengths:
+            sums = prefix[length:] - prefix[:-length]
+            with np.errstate(invalid='ignore', divide='ignore'):
+                if statistic == 'share':
+                    sums = sums / sums.sum(axis=1, keepdims=True)
+                elif statistic == 'growth':
+                    previous = np.full_like(sums, np.nan)
+                    previous[length:] = sums[:-length]
+                    sums = sums / np.where(previous > 0, previous, np.nan) - 1
+            frames[length] = pd.DataFrame(sums, index=self.years[length - 1:],
+                                          columns=self.categories)
+        return pd.concat(frames, names=['length', 'last_year'])